@@ -1,6 +1,13 @@
 import pandas as pd
 import datetime as dt
 import lxml
+import io
+import os
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+CBR_URL = "http://www.cbr.ru/scripts/XML_daily.asp?date_req={date}"
+CACHE_DIRECTORY = "cbr_cache"
 
 
 def read_csv_and_get_currency_frequency(file):
@@ -12,24 +19,66 @@ def read_csv_and_get_currency_frequency(file):
     print(df_currency)
 
 
-def get_currencies_list(columns):
-    array = []
-    for year in range(2003, 2023):
-        for month in range(1, 13):
-            url = f"http://www.cbr.ru/scripts/XML_daily.asp?date_req=01/{month:02}/{year}"
-            df = pd.read_xml(url, encoding="cp1251")[["CharCode", "Nominal", "Value"]]
-            df = df[df["CharCode"].isin(columns)]
-            df["Value"] = df["Value"].apply(lambda f: float(f.replace(",", ".")))
-            currencies = pd.concat([pd.Series([f"{year}-{month:02}"]), round(df["Value"] / df["Nominal"], 7)])
-            array.append((list(currencies)))
-    return array
+def http_transport(date, url=CBR_URL):
+    with urllib.request.urlopen(url.format(date=date.strftime("%d/%m/%Y")), timeout=30) as response:
+        return response.read()
+
+
+def get_directory_transport(directory):
+    # для тестов и работы без сети: ответы ЦБ лежат в файлах directory/ГГГГ-ММ-ДД.xml
+    def directory_transport(date):
+        with open(os.path.join(directory, f"{date:%Y-%m-%d}.xml"), "rb") as file:
+            return file.read()
+    return directory_transport
+
+
+def get_daily_xml(date, transport=http_transport, cache_directory=CACHE_DIRECTORY):
+    file_name = os.path.join(cache_directory, f"{date:%Y-%m-%d}.xml")
+    if os.path.exists(file_name):
+        with open(file_name, "rb") as file:
+            return file.read()
+    content = transport(date)
+    os.makedirs(cache_directory, exist_ok=True)
+    with open(file_name + ".tmp", "wb") as file:
+        file.write(content)
+    os.replace(file_name + ".tmp", file_name)
+    return content
+
+
+def get_month_currencies(date, columns, transport=http_transport, cache_directory=CACHE_DIRECTORY):
+    xml = get_daily_xml(date, transport, cache_directory)
+    df = pd.read_xml(io.BytesIO(xml), encoding="cp1251")[["CharCode", "Nominal", "Value"]]
+    df = df[df["CharCode"].isin(columns)]
+    df["Value"] = df["Value"].apply(lambda f: float(str(f).replace(",", ".")))
+    rates = dict(zip(df["CharCode"], round(df["Value"] / df["Nominal"], 7)))
+    return [f"{date:%Y-%m}"] + [rates.get(column) for column in columns[1:]]
+
+
+def get_currencies_list(columns, dates=None, transport=http_transport, cache_directory=CACHE_DIRECTORY, max_workers=8):
+    if dates is None:
+        dates = [dt.date(year, month, 1) for year in range(2003, 2023) for month in range(1, 13)]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda date: get_month_currencies(date, columns, transport, cache_directory), dates))
+
 
+def update_currencies_file(file_name, columns, dates=None, transport=http_transport,
+                           cache_directory=CACHE_DIRECTORY, max_workers=8):
+    if dates is None:
+        dates = [dt.date(year, month, 1) for year in range(2003, 2023) for month in range(1, 13)]
+    result_file = pd.read_csv(file_name) if os.path.exists(file_name) else pd.DataFrame(columns=columns)
+    present = set(result_file["date"])
+    missing = [date for date in dates if f"{date:%Y-%m}" not in present]
+    if missing:
+        result = pd.DataFrame(get_currencies_list(columns, missing, transport, cache_directory, max_workers),
+                              columns=columns)
+        result_file = result if result_file.empty else pd.concat([result_file, result], ignore_index=True)
+        result_file = result_file.sort_values("date")
+        result_file.to_csv(file_name, index=False)
+    return result_file
 
-columns_names = ["date", "BYR", "USD", "EUR", "KZT", "UAH"]
 
-read_csv_and_get_currency_frequency("vacancies_dif_currencies.csv")
-result = get_currencies_list(columns_names)
+if __name__ == "__main__":
+    columns_names = ["date", "BYR", "USD", "EUR", "KZT", "UAH"]
 
-result_file = pd.DataFrame(result)
-result_file.columns = columns_names
-result_file.to_csv("currencies_years.csv", index=False)
\ No newline at end of file
+    read_csv_and_get_currency_frequency("vacancies_dif_currencies.csv")
+    update_currencies_file("currencies_years.csv", columns_names)
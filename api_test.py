@@ -0,0 +1,54 @@
+import datetime as dt
+import os
+import tempfile
+from unittest import TestCase
+from api import get_currencies_list, get_directory_transport, update_currencies_file
+
+XML_DAILY = """<?xml version="1.0" encoding="windows-1251"?>
+<ValCurs Date="{date:%d.%m.%Y}" name="Foreign Currency Market">
+<Valute ID="R01235"><NumCode>840</NumCode><CharCode>USD</CharCode><Nominal>1</Nominal><Name>Доллар США</Name><Value>{usd}</Value></Valute>
+<Valute ID="R01335"><NumCode>398</NumCode><CharCode>KZT</CharCode><Nominal>100</Nominal><Name>Тенге</Name><Value>20,3925</Value></Valute>
+</ValCurs>"""
+
+
+class CurrenciesTests(TestCase):
+    columns = ["date", "USD", "KZT", "EUR"]
+    dates = [dt.date(2003, 1, 1), dt.date(2003, 2, 1), dt.date(2003, 3, 1)]
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.fixtures = os.path.join(self.directory.name, "fixtures")
+        self.cache = os.path.join(self.directory.name, "cache")
+        os.makedirs(self.fixtures)
+        for i, date in enumerate(self.dates):
+            with open(os.path.join(self.fixtures, f"{date:%Y-%m-%d}.xml"), "wb") as file:
+                file.write(XML_DAILY.format(date=date, usd=f"3{i},5").encode("cp1251"))
+        self.requested = []
+        fixture_transport = get_directory_transport(self.fixtures)
+
+        def transport(date):
+            self.requested.append(date)
+            return fixture_transport(date)
+        self.transport = transport
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_get_currencies_list(self):
+        self.assertEqual(get_currencies_list(self.columns, self.dates, self.transport, self.cache),
+                         [["2003-01", 30.5, 0.203925, None], ["2003-02", 31.5, 0.203925, None],
+                          ["2003-03", 32.5, 0.203925, None]])
+
+    def test_cache(self):
+        get_currencies_list(self.columns, self.dates, self.transport, self.cache)
+        get_currencies_list(self.columns, self.dates, self.transport, self.cache)
+        self.assertEqual(len(self.requested), 3)
+
+    def test_update_only_missing_months(self):
+        file_name = os.path.join(self.directory.name, "currencies_years.csv")
+        update_currencies_file(file_name, self.columns, self.dates[:2], self.transport, self.cache)
+        self.requested.clear()
+        os.rename(self.cache, self.cache + "_old")
+        result = update_currencies_file(file_name, self.columns, self.dates, self.transport, self.cache)
+        self.assertEqual(self.requested, [self.dates[2]])
+        self.assertEqual(list(result["date"]), ["2003-01", "2003-02", "2003-03"])
@@ -0,0 +1,415 @@
+import argparse
+import datetime
+import importlib.util
+import json
+import math
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+import numpy as np
+import pandas as pd
+
+import task3
+
+# benchmark_stages держит весь файл в памяти (DataSet.csv_reader возвращает список всех строк),
+# поэтому на 10 млн строк замер требует десятки гигабайт и в стандартные размеры не входит.
+# На 1 млн строк уже видны затраты памяти и пропускная способность этапов, поэтому этот размер замеряется по умолчанию
+SIZES = (10000, 100000, 1000000)
+PROFESSION_NAME = "Программист"
+SCRIPTS_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_script(file_name):
+    """Загружает скрипт с точками в имени файла (например, task3.4.3.py) как модуль
+
+    Args:
+        file_name (str): Имя файла скрипта
+
+    Returns:
+        module: Загруженный модуль
+    """
+    spec = importlib.util.spec_from_file_location(file_name[:-3].replace(".", "_"),
+                                                  os.path.join(SCRIPTS_DIRECTORY, file_name))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def convert_currency(string, df_currency):
+    """Прежний построчный перевод зарплаты в рубли из task3.4.1: эталон для замера convert_salaries.
+    Для каждой вакансии разбирает строку и ищет курс перебором таблицы курсов
+
+    Args:
+        string (str): Средняя зарплата, валюта и дата публикации через пробел
+        df_currency (pandas.DataFrame): Таблица currencies_years.csv
+
+    Returns:
+        object: Зарплата в рублях, исходная средняя зарплата, если курса нет, или пустое значение без валюты
+    """
+    if pd.isnull(string):
+        return string
+    arr = string.split()
+    if df_currency.columns.__contains__(arr[1]):
+        date = arr[2]
+        course = df_currency[df_currency["date"] == date[:7]][arr[1]].values
+        if not math.isnan(course[0]):
+            return round(float(arr[0]) * course[0])
+    return arr[0]
+
+
+def get_dataframe(rows_count, years_count, seed=0):
+    """Создаёт синтетический набор вакансий в формате converted_dataframe.csv после предобработки
+
+    Args:
+        rows_count (int): Количество вакансий
+        years_count (int): Количество различных лет публикации
+        seed (int): Начальное значение генератора случайных чисел
+
+    Returns:
+        pandas.DataFrame: Вакансии со столбцами name, salary, area_name, published_at
+    """
+    generator = np.random.default_rng(seed)
+    names = np.array(["Программист", "Аналитик", "Менеджер", "Инженер-программист", "Тестировщик"])
+    areas = np.array(["Москва", "Санкт-Петербург", "Екатеринбург", "Казань", "Новосибирск"])
+    return pd.DataFrame({
+        "name": names[generator.integers(0, len(names), rows_count)],
+        "salary": generator.integers(10000, 300000, rows_count),
+        "area_name": areas[generator.integers(0, len(areas), rows_count)],
+        "published_at": 2022 - generator.integers(0, years_count, rows_count),
+    })
+
+
+def set_statistics_by_masks(data, df, df_match):
+    """Прежний вариант: отдельная фильтрация всего набора данных для каждого года
+
+    Args:
+        data (DataSet): Объект DataSet скрипта task3.4.3.py
+        df (pandas.DataFrame): Вакансии
+        df_match (pandas.Series): Совпадение вакансии с профессией
+    """
+    for year in df["published_at"].unique():
+        filter_by_year = df["published_at"] == year
+        data.salary_by_year[year] = int(df[filter_by_year]["salary"].mean())
+        data.vacancies_count_by_year[year] = len(df[filter_by_year])
+        data.salary_by_profession[year] = int(df[df_match & filter_by_year]["salary"].mean())
+        data.vacancies_count_by_profession[year] = len(df[df_match & filter_by_year])
+
+
+def benchmark_statistics_by_year(rows_count, years_counts, repeat=3):
+    """Сравнивает время расчёта статистики по годам масками и одной группировкой
+
+    Args:
+        rows_count (int): Количество вакансий
+        years_counts (list): Количества различных лет публикации
+        repeat (int): Количество повторов замера, берётся лучшее время
+
+    Returns:
+        list: Строки результата (количество лет, время масками, время группировкой, ускорение)
+    """
+    script = load_script("task3.4.3.py")
+    results = []
+    for years_count in years_counts:
+        df = get_dataframe(rows_count, years_count)
+        df_match = df["name"].str.contains("Программист", na=False)
+        expected, data = script.DataSet(""), script.DataSet("")
+        set_statistics_by_masks(expected, df, df_match)
+        script.InputConnect.set_statistics_by_year(data, df, df_match)
+        assert vars(expected) == vars(data)
+        masks_time = min(timeit.repeat(lambda: set_statistics_by_masks(script.DataSet(""), df, df_match),
+                                       number=1, repeat=repeat))
+        groupby_time = min(timeit.repeat(
+            lambda: script.InputConnect.set_statistics_by_year(script.DataSet(""), df, df_match),
+            number=1, repeat=repeat))
+        results.append((years_count, masks_time, groupby_time, masks_time / groupby_time))
+    return results
+
+
+def get_report_statistics(years_count, cities_count):
+    """Создаёт синтетическую статистику в виде аргументов task3.Report
+
+    Args:
+        years_count (int): Количество лет
+        cities_count (int): Количество городов
+
+    Returns:
+        tuple: Словари статистики по годам и городам
+    """
+    years = range(2022 - years_count + 1, 2023)
+    cities = [f"Город {i}" for i in range(cities_count)]
+    return ({year: 50000 + year for year in years}, {year: 3000 + year % 7 for year in years},
+            {year: 60000 + year for year in years}, {year: 100 + year % 5 for year in years},
+            {city: 100000 - i * 1000 for i, city in enumerate(cities)}, {city: 0.05 for city in cities})
+
+
+def benchmark_pdf(reports_count, engines=("reportlab", "wkhtmltopdf")):
+    """Сравнивает скорость формирования pdf-отчетов task3.Report.generate_pdf: в текущем процессе
+    и через wkhtmltopdf. Первый отчет каждого способа не учитывается (загрузка шрифтов, запуск программы),
+    wkhtmltopdf пропускается, если программа не установлена
+
+    Args:
+        reports_count (int): Количество отчетов
+        engines (tuple): Способы формирования pdf-файла
+
+    Returns:
+        list: Строки результата (способ, время, отчетов в секунду)
+    """
+    statistics = get_report_statistics(16, 10)
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        task3.Report.generate_image(*statistics, "Программист", directory, os.path.join(directory, "cache"))
+        for engine in engines:
+            if engine == "wkhtmltopdf" and shutil.which("wkhtmltopdf") is None:
+                continue
+            task3.Report.generate_pdf(*statistics, "Программист", directory, engine)
+            start = time.perf_counter()
+            for _ in range(reports_count):
+                task3.Report.generate_pdf(*statistics, "Программист", directory, engine)
+            elapsed = time.perf_counter() - start
+            results.append((engine, elapsed, reports_count / elapsed))
+    return results
+
+
+def write_vacancies_csv(file_name, rows_count, seed=0, chunk_size=1000000):
+    """Записывает синтетический csv-файл вакансий в формате vacancies_by_year.csv: часть названий содержит
+    html-теги и лишние пробелы, у части вакансий нет зарплаты (такие строки отбрасывает DataSet.csv_reader)
+
+    Args:
+        file_name (str): Имя csv-файла
+        rows_count (int): Количество вакансий
+        seed (int): Начальное значение генератора случайных чисел
+        chunk_size (int): Количество вакансий, создаваемых в памяти за один раз
+    """
+    generator = np.random.default_rng(seed)
+    names = np.array(["Программист", "<b>Аналитик</b>", "Менеджер  проектов", "Инженер-программист",
+                      "Тестировщик", "Программист 1С", "<p>Java-программист</p>", "Дизайнер"])
+    areas = np.array(["Москва", "Санкт-Петербург", "Екатеринбург", "Казань", "Новосибирск", "Алматы", "Минск"])
+    currencies = np.array(["RUR"] * 6 + sorted(task3.currency_to_rub))
+    first_day = np.datetime64("2003-01-01")
+    days_count = (np.datetime64("2022-12-31") - first_day).astype(int)
+    with open(file_name, "w", encoding="utf-8", newline="") as file:
+        for start in range(0, rows_count, chunk_size):
+            count = min(chunk_size, rows_count - start)
+            salary_from = generator.integers(10, 300, count) * 1000.0
+            salary_from[generator.random(count) < 0.05] = np.nan
+            days = first_day + generator.integers(0, days_count + 1, count)
+            pd.DataFrame({
+                "name": names[generator.integers(0, len(names), count)],
+                "salary_from": salary_from,
+                "salary_to": salary_from + generator.integers(0, 100, count) * 1000.0,
+                "salary_currency": currencies[generator.integers(0, len(currencies), count)],
+                "area_name": areas[generator.integers(0, len(areas), count)],
+                "published_at": np.char.add(np.datetime_as_string(days), "T10:00:00+0300"),
+            }).to_csv(file, index=False, header=start == 0)
+
+
+def get_vacancies_csv(rows_count, data_directory="benchmark_data"):
+    """Возвращает синтетический csv-файл вакансий, создавая его при первом обращении
+
+    Args:
+        rows_count (int): Количество вакансий
+        data_directory (str): Папка созданных файлов
+
+    Returns:
+        str: Имя csv-файла
+    """
+    file_name = os.path.join(data_directory, f"vacancies_{rows_count}.csv")
+    if not os.path.exists(file_name):
+        os.makedirs(data_directory, exist_ok=True)
+        write_vacancies_csv(file_name + ".tmp", rows_count)
+        os.replace(file_name + ".tmp", file_name)
+    return file_name
+
+
+def benchmark_stages(file_name, repeat=3, sample_size=10000):
+    """Замеряет время этапов обработки csv-файла вакансий: чтение и очистку DataSet, создание Vacancy,
+    агрегации InputConnect, перевод валют task3.4.1 и этапы формирования отчета Report.
+    Прежний построчный перевод валют convert_currency замеряется на первых sample_size вакансиях.
+    Все строки файла одновременно находятся в памяти, как при работе DataSet.csv_reader, поэтому размер файла
+    ограничен объемом памяти. Данные передаются замеряемым функциям через аргументы по умолчанию,
+    чтобы del освобождал память после замера
+
+    Args:
+        file_name (str): Имя csv-файла
+        repeat (int): Количество повторов замера, берётся лучшее время
+        sample_size (int): Количество вакансий для convert_currency
+
+    Returns:
+        dict: Для каждого этапа количество обработанных строк, время и строк в секунду
+    """
+    results = {}
+
+    def measure(stage, function, rows_count):
+        seconds = min(timeit.repeat(function, number=1, repeat=repeat))
+        results[stage] = {"rows": rows_count, "seconds": seconds,
+                          "rows_per_second": rows_count / seconds if seconds else None}
+
+    list_naming, reader = task3.DataSet.csv_reader(file_name)
+    measure("DataSet.csv_reader", lambda: task3.DataSet.csv_reader(file_name), len(reader))
+    measure("DataSet.csv_filer", lambda reader=reader: task3.DataSet.csv_filer(list_naming, reader), len(reader))
+    measure("DataSet.remove_html_tags",
+            lambda reader=reader: [task3.DataSet.remove_html_tags(list(row)) for row in reader], len(reader))
+    rows = [task3.DataSet.remove_html_tags(list(row)) for row in reader]
+    del reader
+    measure("Vacancy", lambda rows=rows: [task3.Vacancy(row) for row in rows], len(rows))
+    vacancies = [task3.Vacancy(row) for row in rows]
+    measure("DataSet.get_year_optimized",
+            lambda vacancies=vacancies: [task3.DataSet.get_year_optimized(vacancy.published_at)
+                                         for vacancy in vacancies], len(rows))
+
+    measure("InputConnect.get_statistics",
+            lambda vacancies=vacancies: task3.InputConnect.get_statistics(vacancies, PROFESSION_NAME), len(rows))
+    statistics = task3.InputConnect.get_statistics(vacancies, PROFESSION_NAME)
+    # прежние агрегации InputConnect ожидают год публикации вместо даты
+    data = task3.DataSet(file_name, [task3.Vacancy(row[:5] + [task3.DataSet.get_year_optimized(row[5])])
+                                     for row in rows])
+    del vacancies
+    measure("InputConnect.get_vacancies_count_by_year",
+            lambda data=data: task3.InputConnect.get_vacancies_count_by_year(data, PROFESSION_NAME), len(rows))
+    data.vacancies_count_by_year = task3.InputConnect.get_vacancies_count_by_year(data, "None")
+    data.vacancies_count_by_profession_name = task3.InputConnect.get_vacancies_count_by_year(data, PROFESSION_NAME)
+    measure("InputConnect.get_salary_by_name",
+            lambda data=data: task3.InputConnect.get_salary_by_name(data, PROFESSION_NAME), len(rows))
+    measure("InputConnect.get_vacancy_rate_by_city",
+            lambda data=data: task3.InputConnect.get_vacancy_rate_by_city(data), len(rows))
+    data.vacancy_rate_by_city = task3.InputConnect.get_vacancy_rate_by_city(data)
+    measure("InputConnect.get_salary_by_city", lambda data=data: task3.InputConnect.get_salary_by_city(data),
+            len(rows))
+    del data, rows
+
+    script = load_script("task3.4.1.py")
+    df_currency = pd.read_csv(os.path.join(SCRIPTS_DIRECTORY, "currencies_years.csv"))
+    dataframe = pd.read_csv(file_name)
+    sample = dataframe.head(sample_size)
+    strings = (sample[["salary_from", "salary_to"]].mean(axis=1).astype(str) + " " + sample["salary_currency"] +
+               " " + sample["published_at"]).tolist()
+    measure("convert_currency", lambda: [convert_currency(string, df_currency) for string in strings], len(strings))
+    rates = script.get_rates(df_currency)
+    measure("task3.4.1.convert_salaries", lambda dataframe=dataframe: script.convert_salaries(dataframe, rates),
+            len(dataframe))
+    del dataframe
+
+    report_statistics = (statistics.get_salary_by_name("None"), statistics.get_vacancies_count_by_year("None"),
+                         statistics.get_salary_by_name(PROFESSION_NAME),
+                         statistics.get_vacancies_count_by_year(PROFESSION_NAME),
+                         dict(list(statistics.get_salary_by_city().items())[:10]),
+                         dict(list(statistics.get_vacancy_rate_by_city().items())[:10]), PROFESSION_NAME)
+    with tempfile.TemporaryDirectory() as directory:
+        cache_directory = os.path.join(directory, "cache")
+
+        def generate_image():
+            # каждый повтор рисует графики заново, а не копирует их из кэша
+            shutil.rmtree(cache_directory, ignore_errors=True)
+            task3.Report.generate_image(*report_statistics, directory, cache_directory)
+
+        # первый отчет загружает openpyxl, matplotlib и reportlab и не учитывается
+        generate_image()
+        task3.Report.generate_excel(*report_statistics, directory)
+        task3.Report.generate_pdf(*report_statistics, directory)
+        measure("Report.generate_excel", lambda: task3.Report.generate_excel(*report_statistics, directory), 1)
+        measure("Report.generate_image", generate_image, 1)
+        measure("Report.generate_pdf", lambda: task3.Report.generate_pdf(*report_statistics, directory), 1)
+    return results
+
+
+def get_commit():
+    """Возвращает хэш текущего коммита git
+
+    Returns:
+        str: Хэш коммита или None, если папка скриптов не является репозиторием git
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=SCRIPTS_DIRECTORY, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def benchmark_suite(sizes=SIZES, repeat=3, data_directory="benchmark_data"):
+    """Замеряет этапы обработки на синтетических csv-файлах каждого размера
+
+    Args:
+        sizes (tuple): Количества вакансий в csv-файлах
+        repeat (int): Количество повторов замера, берётся лучшее время
+        data_directory (str): Папка синтетических csv-файлов
+
+    Returns:
+        dict: Описание окружения (коммит, версия Python) и результаты benchmark_stages по размерам
+    """
+    return {
+        "commit": get_commit(),
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "results": {str(rows_count): benchmark_stages(get_vacancies_csv(rows_count, data_directory), repeat)
+                    for rows_count in sizes},
+    }
+
+
+def compare_results(old, new):
+    """Сравнивает два результата benchmark_suite по общим размерам и этапам
+
+    Args:
+        old (dict): Прежний результат
+        new (dict): Новый результат
+
+    Returns:
+        list: Строки (количество вакансий, этап, прежнее время, новое время, ускорение)
+
+    >>> compare_results({"results": {"10": {"Vacancy": {"seconds": 2.0}}}},
+    ...                 {"results": {"10": {"Vacancy": {"seconds": 0.5}}, "20": {"Vacancy": {"seconds": 1.0}}}})
+    [('10', 'Vacancy', 2.0, 0.5, 4.0)]
+    """
+    rows = []
+    for rows_count, stages in new["results"].items():
+        old_stages = old["results"].get(rows_count, {})
+        for stage, result in stages.items():
+            if stage in old_stages:
+                old_seconds = old_stages[stage]["seconds"]
+                rows.append((rows_count, stage, old_seconds, result["seconds"],
+                             old_seconds / result["seconds"] if result["seconds"] else None))
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument("--pdf-reports", type=int)
+    parser.add_argument("--suite", action="store_true")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--data-directory", default="benchmark_data")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare")
+    args = parser.parse_args()
+    if args.suite:
+        suite = benchmark_suite(args.sizes, args.repeat, args.data_directory)
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(suite, file, ensure_ascii=False, indent=2)
+        print(f"{'Строк':>10} {'Этап':<42} {'Время, с':>10} {'Строк/с':>12}")
+        for rows_count, stages in suite["results"].items():
+            for stage, result in stages.items():
+                rows_per_second = "-" if result["rows_per_second"] is None else f"{result['rows_per_second']:.0f}"
+                print(f"{rows_count:>10} {stage:<42} {result['seconds']:>10.4f} {rows_per_second:>12}")
+        if args.compare:
+            with open(args.compare, encoding="utf-8") as file:
+                old_suite = json.load(file)
+            print(f"\n{'Строк':>10} {'Этап':<42} {'Было, с':>10} {'Стало, с':>10} {'Ускорение':>10}")
+            for rows_count, stage, old_seconds, new_seconds, speedup in compare_results(old_suite, suite):
+                speedup = "-" if speedup is None else f"{speedup:.2f}"
+                print(f"{rows_count:>10} {stage:<42} {old_seconds:>10.4f} {new_seconds:>10.4f} {speedup:>10}")
+    elif args.pdf_reports:
+        print(f"{'Способ':>12} {'Время, с':>10} {'Отчетов/с':>10}")
+        for engine, elapsed, reports_per_second in benchmark_pdf(args.pdf_reports):
+            print(f"{engine:>12} {elapsed:>10.4f} {reports_per_second:>10.1f}")
+    else:
+        print(f"{'Лет':>5} {'Маски, с':>10} {'Группировка, с':>15} {'Ускорение':>10}")
+        for years_count, masks_time, groupby_time, speedup in benchmark_statistics_by_year(args.rows, args.years):
+            print(f"{years_count:>5} {masks_time:>10.4f} {groupby_time:>15.4f} {speedup:>10.1f}")
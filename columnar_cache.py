@@ -0,0 +1,258 @@
+import json
+import os
+import shutil
+import sys
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+CACHE_DIRECTORY = "columnar_cache"
+SALARY_COLUMNS = ("salary_from", "salary_to", "salary")
+
+
+def get_cache_directory(file_name):
+    """Возвращает папку колоночного кэша csv-файла
+
+    Args:
+        file_name (str): Имя csv-файла
+
+    Returns:
+        str: Путь к папке кэша
+    """
+    return os.path.join(CACHE_DIRECTORY, os.path.basename(file_name))
+
+
+def get_source_state(file_name):
+    """Возвращает размер и время изменения csv-файла, по которым проверяется актуальность кэша
+
+    Args:
+        file_name (str): Имя csv-файла
+
+    Returns:
+        dict: Размер файла в байтах и время изменения в наносекундах
+    """
+    stat = os.stat(file_name)
+    return {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+
+def get_manifest(file_name):
+    """Считывает описание кэша csv-файла
+
+    Args:
+        file_name (str): Имя csv-файла
+
+    Returns:
+        dict: Описание кэша или None, если кэш не создан
+    """
+    try:
+        with open(os.path.join(get_cache_directory(file_name), "manifest.json"), encoding="utf-8") as manifest_file:
+            return json.load(manifest_file)
+    except (OSError, ValueError):
+        return None
+
+
+def is_fresh(file_name, kind="csv"):
+    """Проверяет, что кэш создан из текущей версии csv-файла
+
+    Args:
+        file_name (str): Имя csv-файла
+        kind (str): Способ разбора файла, с которым создан кэш: "csv" - pandas.read_csv,
+            "vacancies" - очищенные вакансии task3.DataSet
+
+    Returns:
+        bool: True, если кэш можно читать вместо csv-файла
+    """
+    manifest = get_manifest(file_name)
+    if manifest is None or manifest["kind"] != kind or not os.path.exists(file_name):
+        return False
+    return {"size": manifest["size"], "mtime": manifest["mtime"]} == get_source_state(file_name)
+
+
+def get_schema(columns):
+    """Возвращает схему кэша: зарплаты - float64, остальные столбцы - строки. Схема не выводится по первой части:
+    целые зарплаты в одной части и дробные в другой или пустой в первой части столбец иначе получили бы разные типы
+
+    Args:
+        columns (list): Столбцы
+
+    Returns:
+        pyarrow.Schema: Схема
+    """
+    return pa.schema([(column, pa.float64() if column in SALARY_COLUMNS else pa.string()) for column in columns])
+
+
+def convert(file_name, frames=None, kind="csv", chunksize=100000):
+    """Записывает csv-файл в колоночный кэш: по папке year=ГГГГ на каждый год публикации,
+    в папке - parquet-файлы частей в порядке следования вакансий в исходном файле
+
+    Args:
+        file_name (str): Имя csv-файла
+        frames (iterable): Части данных (pandas.DataFrame, pyarrow.Table или словарь столбцов), приводятся
+            к схеме get_schema. По умолчанию файл читается pandas.read_csv частями по chunksize строк
+        kind (str): Способ разбора файла, сохраняется в описании кэша
+        chunksize (int): Количество строк в части при чтении по умолчанию
+
+    Returns:
+        dict: Описание кэша
+    """
+    directory = get_cache_directory(file_name)
+    temporary_directory = directory + ".tmp"
+    shutil.rmtree(temporary_directory, ignore_errors=True)
+    manifest = {"source": file_name, "kind": kind, **get_source_state(file_name), "columns": None, "years": []}
+    if frames is None:
+        dtype = {column: "float64" if column in SALARY_COLUMNS else str for column in pd.read_csv(file_name, nrows=0)}
+        frames = pd.read_csv(file_name, chunksize=chunksize, dtype=dtype)
+    schema = None
+    for part, frame in enumerate(frames):
+        table = frame if isinstance(frame, pa.Table) else pa.table(frame)
+        if isinstance(frame, pd.DataFrame):
+            table = table.replace_schema_metadata()
+        if schema is None:
+            schema, manifest["columns"] = get_schema(table.column_names), table.column_names
+        table = table.cast(schema)
+        years = pc.cast(pc.utf8_slice_codeunits(table.column("published_at"), 0, 4), pa.int64())
+        for year in pc.unique(years).to_pylist():
+            year_directory = os.path.join(temporary_directory, f"year={year}")
+            if year not in manifest["years"]:
+                manifest["years"].append(year)
+                os.makedirs(year_directory)
+            pq.write_table(table.filter(pc.equal(years, year)), os.path.join(year_directory, f"part-{part:06d}.parquet"))
+    os.makedirs(temporary_directory, exist_ok=True)
+    with open(os.path.join(temporary_directory, "manifest.json"), "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=4)
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(temporary_directory, directory)
+    return manifest
+
+
+def get_dataset(file_name, years=None):
+    """Возвращает набор parquet-файлов кэша только для выбранных лет, остальные папки не открываются
+
+    Args:
+        file_name (str): Имя csv-файла
+        years (iterable): Годы публикации, по умолчанию все годы
+
+    Returns:
+        pyarrow.dataset.Dataset: Набор файлов кэша в порядке следования лет в исходном файле
+    """
+    manifest = get_manifest(file_name)
+    directory = get_cache_directory(file_name)
+    files = []
+    for year in manifest["years"]:
+        if years is None or year in years:
+            year_directory = os.path.join(directory, f"year={year}")
+            files.extend(os.path.join(year_directory, part) for part in sorted(os.listdir(year_directory)))
+    return ds.dataset(files, format="parquet")
+
+
+def get_filter(area_name=None, profession_name=None):
+    """Формирует условие отбора вакансий, которое проверяется при чтении parquet-файлов
+
+    Args:
+        area_name (str): Подстрока названия региона
+        profession_name (str): Подстрока названия профессии
+
+    Returns:
+        pyarrow.dataset.Expression: Условие отбора или None
+    """
+    expression = None
+    for column, value in (("area_name", area_name), ("name", profession_name)):
+        if value is not None:
+            condition = pc.match_substring(ds.field(column), value)
+            expression = condition if expression is None else expression & condition
+    return expression
+
+
+def read_table(file_name, columns=None, years=None, area_name=None, profession_name=None):
+    """Считывает вакансии из кэша, декодируя только выбранные столбцы и папки выбранных лет
+
+    Args:
+        file_name (str): Имя csv-файла
+        columns (list): Столбцы, по умолчанию все столбцы исходного файла
+        years (iterable): Годы публикации, по умолчанию все годы
+        area_name (str): Подстрока названия региона
+        profession_name (str): Подстрока названия профессии
+
+    Returns:
+        pyarrow.Table: Вакансии
+    """
+    columns = columns or get_manifest(file_name)["columns"]
+    dataset = get_dataset(file_name, years)
+    if not dataset.files:
+        return pa.table({column: pa.array([], pa.string()) for column in columns})
+    return dataset.to_table(columns=columns, filter=get_filter(area_name, profession_name))
+
+
+def filter_dataframe(df, years=None, area_name=None, profession_name=None):
+    """Отбирает вакансии из DataFrame, прочитанного из csv-файла, по тем же условиям, что и read_table
+
+    Args:
+        df (pandas.DataFrame): Вакансии
+        years (iterable): Годы публикации
+        area_name (str): Подстрока названия региона
+        profession_name (str): Подстрока названия профессии
+
+    Returns:
+        pandas.DataFrame: Отобранные вакансии
+    """
+    if years is not None:
+        df = df[df["published_at"].str[:4].astype("int64").isin(list(years))]
+    if area_name is not None:
+        df = df[df["area_name"].str.contains(area_name, regex=False, na=False)]
+    if profession_name is not None:
+        df = df[df["name"].str.contains(profession_name, regex=False, na=False)]
+    return df
+
+
+def read_csv(file_name, columns=None, years=None, area_name=None, profession_name=None):
+    """Считывает csv-файл в DataFrame: из кэша, если он актуален, иначе из самого файла
+
+    Args:
+        file_name (str): Имя csv-файла
+        columns (list): Столбцы, по умолчанию все столбцы
+        years (iterable): Годы публикации, по умолчанию все годы
+        area_name (str): Подстрока названия региона
+        profession_name (str): Подстрока названия профессии
+
+    Returns:
+        pandas.DataFrame: Вакансии
+    """
+    if is_fresh(file_name):
+        return read_table(file_name, columns, years, area_name, profession_name).to_pandas()
+    df = filter_dataframe(pd.read_csv(file_name), years, area_name, profession_name)
+    return df.reset_index(drop=True) if columns is None else df[columns].reset_index(drop=True)
+
+
+def iter_csv(file_name, chunksize, columns=None, years=None, area_name=None, profession_name=None):
+    """Считывает csv-файл частями не более chunksize строк: из кэша, если он актуален, иначе из самого файла
+
+    Args:
+        file_name (str): Имя csv-файла
+        chunksize (int): Наибольшее количество строк в части
+        columns (list): Столбцы, по умолчанию все столбцы
+        years (iterable): Годы публикации, по умолчанию все годы
+        area_name (str): Подстрока названия региона
+        profession_name (str): Подстрока названия профессии
+
+    Returns:
+        iterator: Части в виде pandas.DataFrame
+    """
+    if is_fresh(file_name):
+        columns = columns or get_manifest(file_name)["columns"]
+        batches = get_dataset(file_name, years).to_batches(columns=columns, batch_size=chunksize,
+                                                          filter=get_filter(area_name, profession_name))
+        for batch in batches:
+            if batch.num_rows:
+                yield batch.to_pandas()
+        return
+    for df in pd.read_csv(file_name, chunksize=chunksize):
+        df = filter_dataframe(df, years, area_name, profession_name)
+        yield df if columns is None else df[columns]
+
+
+if __name__ == "__main__":
+    for name in sys.argv[1:]:
+        print(name, "->", get_cache_directory(name), f"({len(convert(name)['years'])} лет)")
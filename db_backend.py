@@ -0,0 +1,229 @@
+import datetime
+import sqlite3
+from collections import Counter
+from itertools import islice
+
+DATABASE_NAME = "database1.db"
+TABLE_NAME = "exchange_rates"
+BATCH_SIZE = 10000
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+INDEXES = {
+    "exchange_rates_year": "year",
+    "exchange_rates_area_name": "area_name",
+    "exchange_rates_name": "name",
+    "exchange_rates_published_at": "published_at",
+}
+# суммы зарплат и количества вакансий по (год, регион) и (год, название вакансии)
+ROLLUPS = {
+    "exchange_rates_by_year_area": "area_name",
+    "exchange_rates_by_year_name": "name",
+}
+
+
+def connect(database_name=DATABASE_NAME):
+    """Открывает базу данных в режиме журнала WAL, при котором чтение не блокируется записью
+
+    Args:
+        database_name (str): Имя файла базы данных
+
+    Returns:
+        sqlite3.Connection: Соединение с базой данных
+    """
+    connection = sqlite3.connect(database_name)
+    connection.execute("PRAGMA journal_mode=WAL")
+    return connection
+
+
+def create_table(connection):
+    """Пересоздает таблицу вакансий и таблицы сумм. Дата публикации хранится как unix-время, год - отдельным столбцом
+
+    Args:
+        connection (sqlite3.Connection): Соединение с базой данных
+    """
+    connection.execute(f"DROP TABLE IF EXISTS {TABLE_NAME}")
+    connection.execute(f"""CREATE TABLE {TABLE_NAME} (
+        name TEXT,
+        salary REAL,
+        area_name TEXT,
+        published_at INTEGER NOT NULL,
+        year INTEGER NOT NULL
+    )""")
+    for rollup_name, column in ROLLUPS.items():
+        connection.execute(f"DROP TABLE IF EXISTS {rollup_name}")
+        connection.execute(f"""CREATE TABLE {rollup_name} (
+            year INTEGER NOT NULL,
+            {column} TEXT,
+            salary_sum REAL NOT NULL,
+            vacancies_count INTEGER NOT NULL,
+            first_rowid INTEGER NOT NULL,
+            PRIMARY KEY (year, {column})
+        )""")
+
+
+def has_rollups(connection):
+    """Проверяет, что база данных создана текущей версией load и ее можно дополнять
+
+    Args:
+        connection (sqlite3.Connection): Соединение с базой данных
+
+    Returns:
+        bool: True, если таблицы сумм существуют
+    """
+    tables = {name for name, in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    return set(ROLLUPS) <= tables
+
+
+def create_indexes(connection):
+    """Создает индексы по году, региону и названию вакансии
+
+    Args:
+        connection (sqlite3.Connection): Соединение с базой данных
+    """
+    for index_name, column in INDEXES.items():
+        connection.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {TABLE_NAME} ({column})")
+
+
+def get_timestamp(date):
+    """Переводит дату публикации в unix-время без разбора формата через strptime
+
+    Args:
+        date (str): Дата публикации в формате ГГГГ-ММ-ДДTЧЧ:ММ:СС+ЧЧММ
+
+    Returns:
+        int: Количество секунд с 1970-01-01 00:00:00 UTC
+
+    >>> get_timestamp("2022-05-31T17:32:31+0300")
+    1654007551
+    """
+    days = datetime.date(int(date[0:4]), int(date[5:7]), int(date[8:10])).toordinal() - EPOCH_ORDINAL
+    offset = (int(date[20:22]) * 3600 + int(date[22:24]) * 60) * (-1 if date[19] == "-" else 1)
+    return days * 86400 + int(date[11:13]) * 3600 + int(date[14:16]) * 60 + int(date[17:19]) - offset
+
+
+def get_rows(vacancies):
+    """Преобразует вакансии converted_dataframe.csv в строки таблицы. Вакансии без даты публикации пропускаются
+
+    Args:
+        vacancies (iterable): Кортежи (название, зарплата, регион, дата публикации)
+
+    Returns:
+        iterator: Кортежи (название, зарплата или None, регион, unix-время, год)
+    """
+    for name, salary, area_name, published_at in vacancies:
+        if not isinstance(published_at, str):
+            continue
+        if salary != salary:
+            salary = None
+        yield name, salary, area_name, get_timestamp(published_at), int(published_at[:4])
+
+
+def get_new_rows(connection, rows):
+    """Отбирает строки, которых еще нет в таблице. Граница - наибольшая загруженная дата публикации:
+    более ранние строки пропускаются, строки с этой датой сравниваются с уже загруженными по содержимому
+
+    Args:
+        connection (sqlite3.Connection): Соединение с базой данных
+        rows (iterable): Строки таблицы, сформированные get_rows
+
+    Returns:
+        iterator: Новые строки
+    """
+    high_water_mark = connection.execute(f"SELECT MAX(published_at) FROM {TABLE_NAME}").fetchone()[0]
+    if high_water_mark is None:
+        yield from rows
+        return
+    loaded = Counter(connection.execute(f"SELECT * FROM {TABLE_NAME} WHERE published_at = ?", (high_water_mark,)))
+    for row in rows:
+        if row[3] > high_water_mark:
+            yield row
+        elif row[3] == high_water_mark:
+            if loaded[row]:
+                loaded[row] -= 1
+            else:
+                yield row
+
+
+def insert(connection, rows, batch_size=BATCH_SIZE):
+    """Вставляет строки пачками по batch_size строк
+
+    Args:
+        connection (sqlite3.Connection): Соединение с базой данных
+        rows (iterable): Строки таблицы
+        batch_size (int): Количество строк в пачке
+
+    Returns:
+        int: Количество вставленных строк
+    """
+    rows = iter(rows)
+    count = 0
+    while batch := list(islice(rows, batch_size)):
+        connection.executemany(f"INSERT INTO {TABLE_NAME} VALUES (?, ?, ?, ?, ?)", batch)
+        count += len(batch)
+    return count
+
+
+def update_rollups(connection, last_rowid):
+    """Добавляет в таблицы сумм строки, вставленные после строки last_rowid
+
+    Args:
+        connection (sqlite3.Connection): Соединение с базой данных
+        last_rowid (int): Наибольший rowid до вставки
+    """
+    for rollup_name, column in ROLLUPS.items():
+        connection.execute(f"""INSERT INTO {rollup_name} (year, {column}, salary_sum, vacancies_count, first_rowid)
+            SELECT year, {column}, SUM(salary), COUNT(*), MIN(rowid) FROM {TABLE_NAME}
+            WHERE rowid > ? AND salary IS NOT NULL GROUP BY year, {column}
+            ON CONFLICT (year, {column}) DO UPDATE SET salary_sum = salary_sum + excluded.salary_sum,
+                vacancies_count = vacancies_count + excluded.vacancies_count""", (last_rowid,))
+
+
+def load(connection, vacancies, batch_size=BATCH_SIZE):
+    """Загружает вакансии в пересозданную таблицу одной транзакцией.
+    На время загрузки отключается синхронизация с диском, индексы строятся один раз после вставки всех строк
+
+    Args:
+        connection (sqlite3.Connection): Соединение с базой данных
+        vacancies (iterable): Кортежи (название, зарплата, регион, дата публикации)
+        batch_size (int): Количество строк в пачке executemany
+
+    Returns:
+        int: Количество загруженных вакансий
+    """
+    connection.execute("PRAGMA synchronous=OFF")
+    try:
+        with connection:
+            connection.execute("BEGIN")
+            create_table(connection)
+            count = insert(connection, get_rows(vacancies), batch_size)
+            create_indexes(connection)
+            update_rollups(connection, 0)
+    finally:
+        connection.execute("PRAGMA synchronous=NORMAL")
+    connection.execute("ANALYZE")
+    return count
+
+
+def update(connection, vacancies, batch_size=BATCH_SIZE):
+    """Дополняет таблицу вакансиями, опубликованными не раньше уже загруженных, и обновляет таблицы сумм
+    одной транзакцией. Если таблицы еще нет или она создана без таблиц сумм, выполняется полная загрузка
+
+    Args:
+        connection (sqlite3.Connection): Соединение с базой данных
+        vacancies (iterable): Кортежи (название, зарплата, регион, дата публикации)
+        batch_size (int): Количество строк в пачке executemany
+
+    Returns:
+        int: Количество добавленных вакансий
+    """
+    if not has_rollups(connection):
+        return load(connection, vacancies, batch_size)
+    connection.execute("PRAGMA synchronous=OFF")
+    try:
+        with connection:
+            connection.execute("BEGIN")
+            last_rowid = connection.execute(f"SELECT IFNULL(MAX(rowid), 0) FROM {TABLE_NAME}").fetchone()[0]
+            count = insert(connection, get_new_rows(connection, get_rows(vacancies)), batch_size)
+            update_rollups(connection, last_rowid)
+    finally:
+        connection.execute("PRAGMA synchronous=NORMAL")
+    return count
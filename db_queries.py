@@ -0,0 +1,57 @@
+from contextlib import closing
+
+import db_backend
+from task3 import DataSet, InputConnect, VacancyStatistics
+
+# таблицы сумм содержат только вакансии с зарплатой, как task3.DataSet пропускает строки с пустыми ячейками
+SALARY_BY_YEAR = ("SELECT year, SUM(salary_sum), SUM(vacancies_count) FROM exchange_rates_by_year_area "
+                  "GROUP BY year ORDER BY year")
+SALARY_BY_PROFESSION = ("SELECT year, SUM(salary_sum), SUM(vacancies_count) FROM exchange_rates_by_year_name "
+                        "WHERE instr(name, :profession_name) > 0 GROUP BY year ORDER BY year")
+# города в порядке первого появления, как в словарях VacancyStatistics
+SALARY_BY_CITY = ("SELECT area_name, SUM(salary_sum), SUM(vacancies_count) FROM exchange_rates_by_year_area "
+                  "GROUP BY area_name ORDER BY MIN(first_rowid)")
+
+
+def get_totals(connection, query, parameters=None):
+    """Выполняет запрос группировки и возвращает суммы зарплат и количества вакансий по ключу группировки
+
+    Args:
+        connection (sqlite3.Connection): Соединение с базой данных
+        query (str): Запрос, возвращающий строки (ключ, сумма зарплат, количество вакансий)
+        parameters (dict): Параметры запроса
+
+    Returns:
+        tuple: Словари сумм зарплат и количеств вакансий
+    """
+    salary, vacancies_count = {}, {}
+    for key, salary_sum, count in connection.execute(query, parameters or {}):
+        salary[key], vacancies_count[key] = salary_sum, count
+    return salary, vacancies_count
+
+
+def get_statistics(connection, profession_name):
+    """Собирает суммы и количества вакансий запросами к таблицам сумм базы данных. Округление, отбор городов с долей
+    не меньше 1% и сортировку выполняют методы VacancyStatistics, поэтому результат совпадает с task3
+
+    Args:
+        connection (sqlite3.Connection): Соединение с базой данных
+        profession_name (str): Название профессии
+
+    Returns:
+        VacancyStatistics: Статистика по всем вакансиям базы данных
+    """
+    statistics = VacancyStatistics(profession_name)
+    statistics.salary_by_year, statistics.vacancies_count_by_year = get_totals(connection, SALARY_BY_YEAR)
+    statistics.salary_by_profession_name, statistics.vacancies_count_by_profession_name = get_totals(
+        connection, SALARY_BY_PROFESSION, {"profession_name": profession_name})
+    statistics.salary_by_city, statistics.vacancies_count_by_city = get_totals(connection, SALARY_BY_CITY)
+    statistics.vacancies_count = sum(statistics.vacancies_count_by_year.values())
+    return statistics
+
+
+if __name__ == "__main__":
+    input_data = InputConnect()
+    with closing(db_backend.connect()) as connection:
+        statistics = get_statistics(connection, input_data.profession_name)
+    input_data.print_data_dict(input_data, DataSet(db_backend.DATABASE_NAME), statistics)
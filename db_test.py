@@ -0,0 +1,65 @@
+import os
+import tempfile
+from unittest import TestCase
+import db_backend
+import db_queries
+from task3 import Vacancy, InputConnect
+
+
+class DatabaseTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.connection = db_backend.connect(os.path.join(self.directory.name, "database.db"))
+        self.vacancies = [Vacancy(['Программист', 1000, 3000, 'RUR', 'Москва', '2021-05-31T17:32:31+0300']),
+                          Vacancy(['Аналитик', 3000, 5000, 'RUR', 'Казань', '2021-06-30T17:32:31+0300']),
+                          Vacancy(['Программист 1С', 5000, 7000, 'RUR', 'Москва', '2022-01-31T17:32:31+0300'])]
+        rows = [(vacancy.name, InputConnect.convert_currency(vacancy), vacancy.area_name, vacancy.published_at)
+                for vacancy in self.vacancies]
+        rows.append(('Тестировщик', float("nan"), 'Москва', '2022-01-31T17:32:31+0300'))
+        self.loaded_count = db_backend.load(self.connection, rows)
+
+    def tearDown(self):
+        self.connection.close()
+        self.directory.cleanup()
+
+    def test_load(self):
+        self.assertEqual(self.loaded_count, 4)
+        self.assertEqual(self.connection.execute("SELECT year, published_at FROM exchange_rates LIMIT 1").fetchone(),
+                         (2021, 1622471551))
+        query = "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'exchange_rates'"
+        indexes = {name for name, in self.connection.execute(query)}
+        self.assertEqual(indexes, set(db_backend.INDEXES))
+
+    def test_load_replaces_table(self):
+        self.assertEqual(db_backend.load(self.connection, []), 0)
+
+    def test_get_statistics(self):
+        statistics = db_queries.get_statistics(self.connection, 'Программист')
+        expected = InputConnect.get_statistics(self.vacancies, 'Программист')
+        self.assertEqual(statistics.get_salary_by_name('None'), {2021: 3000, 2022: 6000})
+        self.assertEqual(statistics.get_vacancies_count_by_year('Программист'), {2021: 1, 2022: 1})
+        for name in ('None', 'Программист'):
+            self.assertEqual(statistics.get_salary_by_name(name), expected.get_salary_by_name(name))
+            self.assertEqual(statistics.get_vacancies_count_by_year(name), expected.get_vacancies_count_by_year(name))
+        self.assertEqual(statistics.get_salary_by_city(), expected.get_salary_by_city())
+        self.assertEqual(statistics.get_vacancy_rate_by_city(), expected.get_vacancy_rate_by_city())
+
+    def test_update(self):
+        rows = [('Тестировщик', float("nan"), 'Москва', '2022-01-31T17:32:31+0300'),
+                ('Программист', 8000.0, 'Казань', '2022-01-31T17:32:31+0300'),
+                ('Программист', 1000.0, 'Казань', '2020-01-31T17:32:31+0300'),
+                ('Программист', 9000.0, 'Казань', '2022-02-01T10:00:00+0300')]
+        self.assertEqual(db_backend.update(self.connection, rows), 2)
+        self.assertEqual(db_backend.update(self.connection, rows), 0)
+        self.assertEqual(self.connection.execute("SELECT COUNT(*) FROM exchange_rates").fetchone()[0], 6)
+        statistics = db_queries.get_statistics(self.connection, 'Программист')
+        self.assertEqual(statistics.get_vacancies_count_by_year('None'), {2021: 2, 2022: 3})
+        self.assertEqual(statistics.get_salary_by_name('Программист'), {2021: 2000, 2022: 7666})
+        self.assertEqual(statistics.get_salary_by_city(), {'Казань': 7000, 'Москва': 4000})
+
+    def test_update_creates_table(self):
+        connection = db_backend.connect(os.path.join(self.directory.name, "new.db"))
+        rows = [('Программист', 1000.0, 'Казань', '2020-01-31T17:32:31+0300')]
+        self.assertEqual(db_backend.update(connection, rows), 1)
+        self.assertTrue(db_backend.has_rollups(connection))
+        connection.close()
@@ -1,13 +1,20 @@
+import matplotlib
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 import numpy as np
 from openpyxl import Workbook
-from openpyxl.styles import Font, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Border, NamedStyle, Side
 from openpyxl.utils import get_column_letter
 from openpyxl.styles.numbers import FORMAT_PERCENTAGE_00
-from jinja2 import Environment, FileSystemLoader
 import pdfkit
-from openpyxl.reader.excel import load_workbook
-import pandas as pd
+import os
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import columnar_cache
+import pdf_backend
+import report_templates
 
 
 class DataSet:
@@ -36,20 +43,13 @@ class InputConnect:
 
     @staticmethod
     def print_data_dict(self, data: DataSet):
-        df = pd.read_csv(data.file_name)
+        df = columnar_cache.read_csv(data.file_name)
         df['salary'] = df['salary'].fillna(0)
         df['salary'] = df['salary'].astype("int64")
         df["published_at"] = df["published_at"].apply(lambda d: int(d[:4]))
-        years = df["published_at"].unique()
-        df_vacancy = df["name"].str.contains(self.profession_name)
-        df_area = df["area_name"].str.contains(self.area_name)
-
-        for year in years:
-            filter_by_year = df["published_at"] == year
-            data.salary_by_year[year] = int(df[filter_by_year]["salary"].mean())
-            data.vacancies_count_by_year[year] = len(df[filter_by_year])
-            data.salary_by_profession_name[year] = int(df[df_vacancy & filter_by_year & df_area]["salary"].mean())
-            data.vacancies_count_by_profession_name[year] = len(df[df_vacancy & filter_by_year & df_area])
+        df_vacancy = df["name"].str.contains(self.profession_name, regex=False, na=False)
+        df_area = df["area_name"].str.contains(self.area_name, regex=False, na=False)
+        InputConnect.set_statistics_by_year(data, df, df_vacancy & df_area)
 
         count = len(df)
         df["count"] = df.groupby("area_name")["area_name"].transform("count")
@@ -61,67 +61,108 @@ class InputConnect:
 
         data.vacancy_rate_by_city = {k: round(v / count, 4) for k, v in dict(df["area_name"].value_counts()).items()}
 
+    @staticmethod
+    def print_data_dict_by_chunks(self, data: DataSet, chunksize):
+        totals_by_year, totals_by_profession, totals_by_area = {}, {}, {}
+        count = 0
+        for df in columnar_cache.iter_csv(data.file_name, chunksize):
+            df['salary'] = df['salary'].fillna(0).astype("int64")
+            df["published_at"] = df["published_at"].str[:4].astype("int64")
+            df_vacancy = df["name"].str.contains(self.profession_name, regex=False, na=False)
+            df_area = df["area_name"].str.contains(self.area_name, regex=False, na=False)
+            count += len(df)
+            InputConnect.add_year_totals(totals_by_year, totals_by_profession,
+                                         df.groupby(["published_at", df_vacancy & df_area], sort=False)["salary"])
+            InputConnect.add_totals(totals_by_area, df.groupby("area_name", sort=False)["salary"])
+
+        InputConnect.set_year_totals(data, totals_by_year, totals_by_profession)
+
+        salary_by_area = {area: salary_sum / area_count for area, (salary_sum, area_count) in totals_by_area.items()
+                          if area_count > 0.01 * count}
+        data.salary_by_city = {area: int(salary) for area, salary in
+                               sorted(salary_by_area.items(), key=lambda item: item[1], reverse=True)[:10]}
+        data.vacancy_rate_by_city = {area: round(area_count / count, 4) for area, (salary_sum, area_count) in
+                                     sorted(totals_by_area.items(), key=lambda item: item[1][1], reverse=True)}
+
+    @staticmethod
+    def set_statistics_by_year(data: DataSet, df, df_match):
+        # одна группировка по (год, совпадение по профессии) вместо отдельной фильтрации на каждый год
+        totals_by_year, totals_by_profession = {}, {}
+        InputConnect.add_year_totals(totals_by_year, totals_by_profession,
+                                     df.groupby(["published_at", df_match], sort=False)["salary"])
+        InputConnect.set_year_totals(data, totals_by_year, totals_by_profession)
+
+    @staticmethod
+    def set_year_totals(data: DataSet, totals_by_year, totals_by_profession):
+        for year, (salary_sum, salary_count) in totals_by_year.items():
+            profession_sum, profession_count = totals_by_profession.get(year, (0, 0))
+            data.salary_by_year[year] = int(salary_sum / salary_count)
+            data.vacancies_count_by_year[year] = salary_count
+            data.salary_by_profession_name[year] = int(profession_sum / profession_count) if profession_count else 0
+            data.vacancies_count_by_profession_name[year] = profession_count
+
+    @staticmethod
+    def add_year_totals(totals_by_year, totals_by_profession, grouped_salary):
+        for (year, is_match), salary_sum, salary_count in grouped_salary.agg(["sum", "count"]).itertuples():
+            totals = [totals_by_year, totals_by_profession] if is_match else [totals_by_year]
+            for year_totals in totals:
+                previous_sum, previous_count = year_totals.get(year, (0, 0))
+                year_totals[year] = (previous_sum + int(salary_sum), previous_count + int(salary_count))
+
+    @staticmethod
+    def add_totals(totals, grouped_salary):
+        for key, salary_sum, salary_count in grouped_salary.agg(["sum", "count"]).itertuples():
+            previous_sum, previous_count = totals.get(key, (0, 0))
+            totals[key] = (previous_sum + int(salary_sum), previous_count + int(salary_count))
+
 
 class Report:
+    @staticmethod
+    def get_rows(profession_name, data: DataSet):
+        heads_1 = ["Год", "Средняя зарплата", f"Средняя зарплата - {profession_name}",
+                   "Количество вакансий", f"Количество вакансий - {profession_name}"]
+        rows_1 = [[key, data.salary_by_year[key], data.salary_by_profession_name[key],
+                   data.vacancies_count_by_year[key], data.vacancies_count_by_profession_name[key]]
+                  for key in data.salary_by_year]
+        heads_2 = ["Город", "Уровень зарплат", None, "Город", "Доля вакансий"]
+        city_keys = list(data.vacancy_rate_by_city.keys())
+        rows_2 = [[key, data.salary_by_city[key], None, city_keys[i], data.vacancy_rate_by_city[city_keys[i]]]
+                  for i, key in enumerate(data.salary_by_city.keys())]
+        return heads_1, rows_1, heads_2, rows_2
+
     @staticmethod
     def generate_excel(profession_name, data: DataSet):
+        # книга write_only: строки сразу записываются в файл, ячейки используют общие именованные стили
         def as_text(value):
             if value is None:
                 return ""
             return str(value)
 
-        def set_max_length(worksheet):
-            for column_cells in worksheet.columns:
-                length = max(len(as_text(cell.value)) for cell in column_cells)
-                worksheet.column_dimensions[get_column_letter(column_cells[0].column)].width = length + 2
-
-        def set_format_percent(worksheet):
-            for i, column_cells in enumerate(worksheet.columns):
-                if i == 4:
-                    for cell in column_cells:
-                        cell.number_format = FORMAT_PERCENTAGE_00
-
-        def set_border_style(worksheet):
-            for column_cells in worksheet.columns:
-                for cell in column_cells:
-                    bd = Side(style="thin", color="000000")
-                    cell.border = Border(left=bd, top=bd, right=bd, bottom=bd)
-
-        def set_headers(headers, head_range):
-            for i, cell in enumerate(head_range):
-                cell.value = headers[i]
-                cell.font = Font(size=11, b=True)
-
-        wb = Workbook()
-        sheet_1 = wb.worksheets[0]
-        sheet_1.title = "Статистика по годам"
-        sheet_2 = wb.create_sheet("Статистика по городам")
-        headers = ["Год", "Средняя зарплата", f"Средняя зарплата - {profession_name}",
-                   "Количество вакансий", f"Количество вакансий - {profession_name}"]
-        set_headers(headers, sheet_1['A1':'E1'][0])
-
-        for key in data.salary_by_year:
-            sheet_1.append([key, data.salary_by_year[key], data.salary_by_profession_name[key],
-                            data.vacancies_count_by_year[key], data.vacancies_count_by_profession_name[key]])
-        set_border_style(sheet_1)
-        set_max_length(sheet_1)
-
-        set_headers(["Город", "Уровень зарплат"], sheet_2['A1':'B1'][0])
-        set_headers(["Город", "Доля вакансий"], sheet_2['D1':'E1'][0])
-        sheet_2.column_dimensions['C'].width = 2
-        city_keys = list(data.vacancy_rate_by_city.keys())
-        for i, key in enumerate(data.salary_by_city.keys()):
-            sheet_2.append([key, data.salary_by_city[key], None, city_keys[i], data.vacancy_rate_by_city[city_keys[i]]])
-
-        for i, column_cells in enumerate(sheet_2.columns):
-            for cell in column_cells:
-                if i != 2:
-                    bd = Side(style="thin", color="000000")
-                    cell.border = Border(left=bd, top=bd, right=bd, bottom=bd)
-        set_format_percent(sheet_2)
-        set_max_length(sheet_2)
+        def write_sheet(title, heads, rows, styles):
+            worksheet = wb.create_sheet(title)
+            # ширина столбцов задается до записи строк, поэтому вычисляется по значениям
+            for i, column in enumerate(zip(heads, *rows)):
+                length = max(len(as_text(value)) for value in column)
+                worksheet.column_dimensions[get_column_letter(i + 1)].width = length + 2
+            for values, is_head in [(heads, True)] + [(row, False) for row in rows]:
+                cells = []
+                for value, style in zip(values, styles):
+                    cell = WriteOnlyCell(worksheet, value)
+                    if style is not None:
+                        cell.style = "head" if is_head else style
+                    cells.append(cell)
+                worksheet.append(cells)
+
+        bd = Side(style="thin", color="000000")
+        border = Border(left=bd, top=bd, right=bd, bottom=bd)
+        wb = Workbook(write_only=True)
+        wb.add_named_style(NamedStyle("head", font=Font(size=11, b=True), border=border))
+        wb.add_named_style(NamedStyle("cell", border=border))
+        wb.add_named_style(NamedStyle("percent", border=border, number_format=FORMAT_PERCENTAGE_00))
+        heads_1, rows_1, heads_2, rows_2 = Report.get_rows(profession_name, data)
+        write_sheet("Статистика по годам", heads_1, rows_1, ["cell"] * 5)
+        write_sheet("Статистика по городам", heads_2, rows_2, ["cell", "cell", None, "cell", "percent"])
         wb.save("report.xlsx")
-        return
 
     @staticmethod
     def generate_image(profession_name, data: DataSet):
@@ -176,30 +217,39 @@ class Report:
         plt.tight_layout()
         fig.set_size_inches(9.5, 7.5)
         plt.savefig("graph.png", dpi=120)
+        plt.close(fig)
         return
 
     @staticmethod
-    def generate_pdf(profession_name, data: DataSet):
-        Report.generate_excel(profession_name, data)
-        Report.generate_image(profession_name, data)
-        name = profession_name
-        image_file = "graph.png"
-        book = load_workbook("report.xlsx")
-        sheet_1 = book.active
-        sheet_2 = book['Статистика по городам']
-        for row in range(2, sheet_2.max_row + 1):
-            for col in range(4, 6):
-                if type(sheet_2.cell(row, col).value).__name__ == "float":
-                    sheet_2.cell(row, col).value = str(round(sheet_2.cell(row, col).value * 100, 2)) + '%'
-
-        env = Environment(loader=FileSystemLoader('.'))
-        template = env.get_template("pdf_template_2.html")
-        pdf_template = template.render({'name': name, 'image_file': image_file, 'sheet_1': sheet_1, 'sheet_2': sheet_2})
-        config = pdfkit.configuration(wkhtmltopdf=r'D:\wkhtmltox\bin\wkhtmltopdf.exe')
+    def generate_pdf(profession_name, data: DataSet, engine="reportlab"):
+        heads_1, rows_1, heads_2, rows_2 = Report.get_rows(profession_name, data)
+        rates = [[row[3], str(round(row[4] * 100, 2)) + '%'] for row in rows_2]
+        city_tables = [(heads_2[:2], [row[:2] for row in rows_2]), (heads_2[3:], rates)]
+        if engine == "reportlab":
+            # pdf-файл формируется в текущем процессе, без внешней программы wkhtmltopdf
+            pdf_backend.render("report.pdf", profession_name, "graph.png", heads_1, rows_1, city_tables)
+            return
+        pdf_template = report_templates.render("pdf_template_2.html", profession_name, os.path.abspath("graph.png"),
+                                               heads_1, rows_1, city_tables)
+        config = pdfkit.configuration(wkhtmltopdf=shutil.which("wkhtmltopdf") or r'D:\wkhtmltox\bin\wkhtmltopdf.exe')
         pdfkit.from_string(pdf_template, 'report.pdf', configuration=config, options={"enable-local-file-access": ""})
 
-
-inputparam = InputConnect()
-dataset = DataSet(inputparam.file_name)
-InputConnect.print_data_dict(inputparam, dataset)
-Report.generate_pdf(inputparam.profession_name, dataset)
\ No newline at end of file
+    @staticmethod
+    def generate_report(profession_name, data: DataSet):
+        # таблица строится одновременно с графиками, pdf-файл - после графиков, которые он содержит
+        with ProcessPoolExecutor(3) as executor:
+            excel = executor.submit(Report.generate_excel, profession_name, data)
+            executor.submit(Report.generate_image, profession_name, data).result()
+            pdf = executor.submit(Report.generate_pdf, profession_name, data)
+            excel.result()
+            pdf.result()
+
+
+if __name__ == "__main__":
+    inputparam = InputConnect()
+    dataset = DataSet(inputparam.file_name)
+    if "--chunksize" in sys.argv:
+        InputConnect.print_data_dict_by_chunks(inputparam, dataset, int(sys.argv[sys.argv.index("--chunksize") + 1]))
+    else:
+        InputConnect.print_data_dict(inputparam, dataset)
+    Report.generate_report(inputparam.profession_name, dataset)
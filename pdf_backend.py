@@ -0,0 +1,100 @@
+import os
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+import matplotlib
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import mm
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Table, TableStyle
+
+# шрифты DejaVu Sans с кириллицей входят в состав matplotlib, поэтому не требуют установки
+FONT_NAME = "DejaVuSans"
+BOLD_FONT_NAME = "DejaVuSans-Bold"
+MARGIN = 15 * mm
+TABLES_GAP = 5 * mm
+TABLE_STYLE = TableStyle([
+    ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+    ("FONT", (0, 0), (-1, -1), FONT_NAME, 8),
+    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+])
+LAYOUT_STYLE = TableStyle([
+    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ("LEFTPADDING", (0, 0), (-1, -1), 0),
+    ("RIGHTPADDING", (0, 0), (-1, -1), 0),
+])
+
+
+@lru_cache(maxsize=None)
+def get_styles():
+    """Регистрирует шрифты и создает стили абзацев. Выполняется один раз в процессе,
+    следующие отчеты используют уже загруженные шрифты
+
+    Returns:
+        dict: Стили заголовка отчета, заголовков разделов и заголовков столбцов таблиц
+    """
+    fonts_directory = os.path.join(matplotlib.get_data_path(), "fonts", "ttf")
+    pdfmetrics.registerFont(TTFont(FONT_NAME, os.path.join(fonts_directory, "DejaVuSans.ttf")))
+    pdfmetrics.registerFont(TTFont(BOLD_FONT_NAME, os.path.join(fonts_directory, "DejaVuSans-Bold.ttf")))
+    return {
+        "title": ParagraphStyle("title", fontName=BOLD_FONT_NAME, fontSize=18, leading=22, alignment=TA_CENTER,
+                                spaceAfter=4 * mm),
+        "heading": ParagraphStyle("heading", fontName=BOLD_FONT_NAME, fontSize=16, leading=20, alignment=TA_CENTER,
+                                  spaceBefore=6 * mm, spaceAfter=4 * mm),
+        "head": ParagraphStyle("head", fontName=BOLD_FONT_NAME, fontSize=9, leading=11, alignment=TA_CENTER),
+    }
+
+
+def get_table(heads, rows, width):
+    """Создает таблицу с рамками равной ширины столбцов. Заголовки переносятся по словам
+
+    Args:
+        heads (list): Заголовки столбцов
+        rows (list): Строки таблицы
+        width (float): Ширина таблицы в пунктах
+
+    Returns:
+        reportlab.platypus.Table: Таблица
+    """
+    head_style = get_styles()["head"]
+    data = [[Paragraph(escape(str(head)), head_style) for head in heads]]
+    data.extend(["" if value is None else str(value) for value in row] for row in rows)
+    table = Table(data, colWidths=[width / len(heads)] * len(heads), repeatRows=1)
+    table.setStyle(TABLE_STYLE)
+    return table
+
+
+def render(file_name, profession_name, image_file, year_heads, year_rows, city_tables):
+    """Формирует pdf-файл отчета в текущем процессе: заголовок, изображение с графиками,
+    таблица статистики по годам и таблицы статистики по городам рядом друг с другом
+
+    Args:
+        file_name (str): Имя pdf-файла
+        profession_name (str): Название профессии
+        image_file (str): Путь к изображению с графиками
+        year_heads (list): Заголовки таблицы статистики по годам
+        year_rows (list): Строки таблицы статистики по годам
+        city_tables (list): Пары (заголовки, строки) таблиц статистики по городам
+    """
+    styles = get_styles()
+    document = SimpleDocTemplate(file_name, pagesize=A4, leftMargin=MARGIN, rightMargin=MARGIN, topMargin=MARGIN,
+                                 bottomMargin=MARGIN, title=f"Аналитика для профессии {profession_name}")
+    image_width, image_height = ImageReader(image_file).getSize()
+    table_width = (document.width - TABLES_GAP * (len(city_tables) - 1)) / len(city_tables)
+    layout = Table([[get_table(heads, rows, table_width) for heads, rows in city_tables]],
+                   colWidths=[table_width + TABLES_GAP] * (len(city_tables) - 1) + [table_width])
+    layout.setStyle(LAYOUT_STYLE)
+    document.build([
+        Paragraph(f"Аналитика по зарплатам и городам для профессии {escape(profession_name)}", styles["title"]),
+        Image(image_file, width=document.width, height=document.width * image_height / image_width),
+        Paragraph("Статистика по годам", styles["heading"]),
+        get_table(year_heads, year_rows, document.width),
+        Paragraph("Статистика по городам", styles["heading"]),
+        layout,
+    ])
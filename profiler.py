@@ -0,0 +1,378 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+try:
+    import resource
+except ImportError:
+    # модуля resource нет в Windows, пиковый объем памяти не замеряется
+    resource = None
+
+# пока замер выключен, этапы и обертки возвращают исходные функции и итераторы или пустой контекст,
+# поэтому на каждую вакансию не приходится ни одного дополнительного вызова
+enabled = False
+# путь этапа (имена вложенных этапов через ";") -> [секунды, вызовы, строки]
+stages = {}
+workers = {}
+lock = threading.Lock()
+local = threading.local()
+NULL_STAGE = nullcontext()
+
+
+def enable():
+    """Включает замер этапов в текущем процессе"""
+    global enabled
+    enabled = True
+
+
+def reset():
+    """Удаляет накопленные замеры текущего процесса и результаты рабочих процессов"""
+    with lock:
+        stages.clear()
+        workers.clear()
+
+
+def get_stack():
+    """Возвращает имена этапов, выполняемых в текущем потоке
+
+    Returns:
+        tuple: Имена этапов от внешнего к внутреннему
+    """
+    return getattr(local, "stack", ())
+
+
+def add(path, seconds, rows=0, calls=1):
+    """Добавляет время, количество вызовов и обработанных строк к этапу
+
+    Args:
+        path (str): Путь этапа
+        seconds (float): Время в секундах
+        rows (int): Количество обработанных строк
+        calls (int): Количество вызовов
+    """
+    with lock:
+        record = stages.setdefault(path, [0.0, 0, 0])
+        record[0] += seconds
+        record[1] += calls
+        record[2] += rows
+
+
+def add_rows(rows):
+    """Добавляет количество обработанных строк к выполняемому этапу
+
+    Args:
+        rows (int): Количество строк
+    """
+    if enabled:
+        add(";".join(get_stack()), 0.0, rows, 0)
+
+
+@contextmanager
+def timed_stage(name, rows):
+    """Замеряет время блока кода как вложенного этапа текущего потока
+
+    Args:
+        name (str): Имя этапа
+        rows (int): Количество обработанных строк
+    """
+    stack = get_stack()
+    local.stack = stack + (name,)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add(";".join(local.stack), time.perf_counter() - start, rows)
+        local.stack = stack
+
+
+def stage(name, rows=0):
+    """Возвращает контекст замера этапа или пустой контекст, если замер выключен
+
+    Args:
+        name (str): Имя этапа
+        rows (int): Количество обработанных строк, если оно известно заранее
+
+    Returns:
+        contextlib.AbstractContextManager: Контекст этапа
+
+    >>> with stage("reading"):
+    ...     pass
+    >>> stages
+    {}
+    """
+    return timed_stage(name, rows) if enabled else NULL_STAGE
+
+
+def profile(name, get_rows=None):
+    """Декоратор: замеряет каждый вызов функции как этап. Используется для функций, вызываемых
+    один раз за этап, построчные функции оборачиваются в timed при включенном замере
+
+    Args:
+        name (str): Имя этапа
+        get_rows (callable): Вычисляет количество обработанных строк по результату и аргументам функции
+
+    Returns:
+        callable: Декоратор
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return function(*args, **kwargs)
+            with timed_stage(name, 0):
+                result = function(*args, **kwargs)
+                if get_rows is not None:
+                    add_rows(get_rows(result, *args, **kwargs))
+            return result
+        return wrapper
+    return decorator
+
+
+def timed(name, function):
+    """Оборачивает построчную функцию: каждый вызов считается одной строкой этапа name
+
+    Args:
+        name (str): Имя этапа
+        function (callable): Функция
+
+    Returns:
+        callable: Исходная функция, если замер выключен, иначе обертка
+    """
+    if not enabled:
+        return function
+
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        add(";".join(get_stack() + (name,)), time.perf_counter() - start, 1)
+        return result
+    return wrapper
+
+
+def timed_iter(name, iterable):
+    """Оборачивает итератор: получение каждого элемента считается одной строкой этапа name
+
+    Args:
+        name (str): Имя этапа
+        iterable (iterable): Итерируемый объект
+
+    Returns:
+        iterable: Исходный объект, если замер выключен, иначе генератор
+    """
+    return iter_timed(name, iter(iterable)) if enabled else iterable
+
+
+def iter_timed(name, iterator):
+    """Генератор для timed_iter
+
+    Args:
+        name (str): Имя этапа
+        iterator (iterator): Итератор
+
+    Yields:
+        object: Очередной элемент итератора
+    """
+    while True:
+        start = time.perf_counter()
+        item = next(iterator, iterator)
+        path = ";".join(get_stack() + (name,))
+        if item is iterator:
+            add(path, time.perf_counter() - start, 0, 0)
+            return
+        add(path, time.perf_counter() - start, 1)
+        yield item
+
+
+def get_peak_rss():
+    """Возвращает пиковый объем памяти текущего процесса
+
+    Returns:
+        int: Объем памяти в байтах или None, если замер недоступен
+    """
+    if resource is None:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux возвращает килобайты, macOS - байты
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+def get_profile():
+    """Возвращает замеры текущего процесса для передачи в основной процесс
+
+    Returns:
+        dict: Идентификатор процесса, пиковый объем памяти и копия замеров этапов
+    """
+    with lock:
+        return {"pid": os.getpid(), "peak_rss": get_peak_rss(),
+                "stages": {path: list(record) for path, record in stages.items()}}
+
+
+def merge(worker_profile):
+    """Добавляет замеры рабочего процесса к замерам текущего процесса
+
+    Args:
+        worker_profile (dict): Результат get_profile рабочего процесса
+    """
+    for path, (seconds, calls, rows) in worker_profile["stages"].items():
+        add(path, seconds, rows, calls)
+    with lock:
+        peak_rss = workers.get(worker_profile["pid"])
+        workers[worker_profile["pid"]] = worker_profile["peak_rss"] if peak_rss is None else \
+            max(peak_rss, worker_profile["peak_rss"])
+
+
+def call(function, arguments, stack=()):
+    """Выполняет функцию в рабочем процессе с замером этапов. Этапы вкладываются в этапы stack
+    основного процесса, из которого отправлена задача
+
+    Args:
+        function (callable): Функция
+        arguments (tuple): Аргументы функции
+        stack (tuple): Этапы основного процесса
+
+    Returns:
+        tuple: Результат функции и замеры задачи (get_profile)
+    """
+    enable()
+    with lock:
+        stages.clear()
+    local.stack = stack
+    try:
+        result = function(*arguments)
+    finally:
+        local.stack = ()
+    return result, get_profile()
+
+
+def submit(executor, function, *arguments):
+    """Отправляет задачу в пул процессов, при включенном замере - вместе с замером ее этапов
+
+    Args:
+        executor (concurrent.futures.Executor): Пул процессов
+        function (callable): Функция
+        *arguments: Аргументы функции
+
+    Returns:
+        concurrent.futures.Future: Задача, результат которой возвращает get_result
+    """
+    if not enabled:
+        return executor.submit(function, *arguments)
+    return executor.submit(call, function, arguments, get_stack())
+
+
+def get_result(future):
+    """Ожидает задачу submit и добавляет замеры рабочего процесса к замерам текущего процесса
+
+    Args:
+        future (concurrent.futures.Future): Задача
+
+    Returns:
+        object: Результат функции
+    """
+    if not enabled:
+        return future.result()
+    result, worker_profile = future.result()
+    merge(worker_profile)
+    return result
+
+
+def starmap(pool, function, arguments):
+    """Выполняет функцию для каждого набора аргументов в пуле multiprocessing.Pool,
+    при включенном замере объединяя замеры рабочих процессов
+
+    Args:
+        pool (multiprocessing.pool.Pool): Пул процессов
+        function (callable): Функция
+        arguments (list): Наборы аргументов
+
+    Returns:
+        list: Результаты функции в порядке наборов аргументов
+    """
+    if not enabled:
+        return pool.starmap(function, arguments)
+    stack = get_stack()
+    results = []
+    for result, worker_profile in pool.starmap(call, [(function, tuple(items), stack) for items in arguments]):
+        merge(worker_profile)
+        results.append(result)
+    return results
+
+
+def get_report():
+    """Формирует итоговые замеры. Время этапов рабочих процессов суммируется,
+    поэтому вложенные этапы пула могут занимать больше времени, чем внешний этап
+
+    Returns:
+        dict: Для каждого этапа время, количество вызовов, строк и строк в секунду,
+            пиковый объем памяти основного процесса и наибольший среди рабочих процессов
+    """
+    with lock:
+        workers_peak_rss = [peak_rss for peak_rss in workers.values() if peak_rss is not None]
+        return {
+            "stages": {path: {"seconds": seconds, "calls": calls, "rows": rows,
+                              "rows_per_second": rows / seconds if rows and seconds else None}
+                       for path, (seconds, calls, rows) in stages.items()},
+            "peak_rss": get_peak_rss(),
+            "workers": {"count": len(workers), "peak_rss": max(workers_peak_rss, default=None)},
+        }
+
+
+def get_folded_stacks():
+    """Формирует замеры в формате свернутых стеков (flamegraph.pl, speedscope): путь этапа
+    и собственное время этапа без вложенных этапов в микросекундах
+
+    Returns:
+        list: Строки формата "внешний;внутренний время"
+
+    >>> stages.update({"report": [3.0, 1, 0], "report;generate_pdf": [1.0, 1, 0]})
+    >>> get_folded_stacks()
+    ['report 2000000', 'report;generate_pdf 1000000']
+    >>> reset()
+    """
+    with lock:
+        self_seconds = {path: record[0] for path, record in stages.items()}
+        for path, record in stages.items():
+            parent = path.rpartition(";")[0]
+            if parent in self_seconds:
+                self_seconds[parent] -= record[0]
+    return [f"{path} {max(round(seconds * 1000000), 0)}" for path, seconds in sorted(self_seconds.items())]
+
+
+def dump(file_name):
+    """Сохраняет замеры: файл с расширением .folded - в формате свернутых стеков, остальные - в json
+
+    Args:
+        file_name (str): Имя файла
+    """
+    with open(file_name, "w", encoding="utf-8") as file:
+        if file_name.endswith(".folded"):
+            file.write("\n".join(get_folded_stacks()) + "\n")
+        else:
+            json.dump(get_report(), file, ensure_ascii=False, indent=2)
+
+
+def get_profile_name(argv, default="profile.json"):
+    """Находит в аргументах командной строки ключ --profile или --profile=имя_файла
+
+    Args:
+        argv (list): Аргументы командной строки
+        default (str): Имя файла для ключа без значения
+
+    Returns:
+        str: Имя файла замеров или None, если ключ не задан
+
+    >>> get_profile_name(["task3.py", "--profile"]), get_profile_name(["task3.py", "--profile=stages.folded"])
+    ('profile.json', 'stages.folded')
+    >>> get_profile_name(["task3.py"]) is None
+    True
+    """
+    for argument in argv[1:]:
+        if argument == "--profile":
+            return default
+        if argument.startswith("--profile="):
+            return argument[len("--profile="):]
+    return None
@@ -0,0 +1,60 @@
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from unittest import TestCase
+import profiler
+from task3 import DataSet, InputConnect
+
+
+class ProfilerTests(TestCase):
+    def tearDown(self):
+        profiler.enabled = False
+        profiler.reset()
+
+    def test_disabled(self):
+        self.assertIs(profiler.timed("cleaning", len), len)
+        rows = [1, 2]
+        self.assertIs(profiler.timed_iter("reading", rows), rows)
+        with profiler.stage("reading", 2):
+            profiler.add_rows(1)
+        self.assertEqual(profiler.stages, {})
+
+    def test_nested_stages(self):
+        profiler.enable()
+        with profiler.stage("aggregation"):
+            self.assertEqual(list(profiler.timed_iter("reading", "abc")), ["a", "b", "c"])
+            profiler.timed("cleaning", str.strip)(" a ")
+            profiler.add_rows(3)
+        report = profiler.get_report()["stages"]
+        self.assertEqual(set(report), {"aggregation", "aggregation;reading", "aggregation;cleaning"})
+        self.assertEqual(report["aggregation"]["rows"], 3)
+        self.assertEqual(report["aggregation;reading"]["rows"], 3)
+        self.assertEqual(report["aggregation;cleaning"]["calls"], 1)
+
+    def test_iter_vacancies(self):
+        profiler.enable()
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "vacancies.csv")
+            with open(file_name, "w", encoding="utf-8") as file:
+                file.write("name,salary_from,salary_to,salary_currency,area_name,published_at\n"
+                           "Программист,1000,3000,RUR,Москва,2021-05-31T17:32:31+0300\n"
+                           "Аналитик,,5000,RUR,Казань,2021-06-30T17:32:31+0300\n"
+                           "<b>Программист</b>,5000,7000,RUR,Москва,2022-01-31T17:32:31+0300\n")
+            statistics = InputConnect.get_statistics(DataSet.iter_vacancies(file_name), "Программист")
+        self.assertEqual(statistics.vacancies_count, 2)
+        report = profiler.get_report()["stages"]
+        self.assertEqual(report["aggregation"]["rows"], 2)
+        self.assertEqual(report["aggregation;reading"]["rows"], 3)
+        self.assertEqual(report["aggregation;cleaning"]["rows"], 2)
+        self.assertEqual(report["aggregation;construction"]["rows"], 2)
+
+    def test_merge_workers(self):
+        profiler.enable()
+        with ProcessPoolExecutor(1) as executor, profiler.stage("report"):
+            future = profiler.submit(executor, InputConnect.get_vacancy_rate_by_city, DataSet("file_name"))
+            self.assertEqual(profiler.get_result(future), {})
+        report = profiler.get_report()
+        self.assertEqual(report["stages"]["report;get_vacancy_rate_by_city"]["calls"], 1)
+        self.assertEqual(report["workers"]["count"], 1)
+        self.assertEqual([line.split()[0] for line in profiler.get_folded_stacks()],
+                         ["report", "report;get_vacancy_rate_by_city"])
@@ -0,0 +1,41 @@
+import os
+from functools import lru_cache
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+TEMPLATES_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+# скомпилированные шаблоны сохраняются во временной папке пользователя и загружаются следующими процессами
+# без разбора html; шаблоны не перечитываются с диска при каждом обращении
+environment = Environment(loader=FileSystemLoader(TEMPLATES_DIRECTORY), bytecode_cache=FileSystemBytecodeCache(),
+                          auto_reload=False)
+
+
+@lru_cache(maxsize=None)
+def get_template(template_name):
+    """Возвращает шаблон, скомпилированный один раз в процессе
+
+    Args:
+        template_name (str): Имя файла шаблона в папке модуля
+
+    Returns:
+        jinja2.Template: Шаблон
+    """
+    return environment.get_template(template_name)
+
+
+def render(template_name, name, image_file, year_heads, year_rows, city_tables):
+    """Формирует html-страницу отчета. Шаблоны получают готовые строки таблиц, как pdf_backend.render
+
+    Args:
+        template_name (str): Имя файла шаблона (pdf_template.html или pdf_template_2.html)
+        name (str): Название профессии
+        image_file (str): Абсолютный путь к изображению с графиками
+        year_heads (list): Заголовки таблицы статистики по годам
+        year_rows (list): Строки таблицы статистики по годам
+        city_tables (list): Пары (заголовки, строки) таблиц статистики по городам
+
+    Returns:
+        str: Html-страница
+    """
+    return get_template(template_name).render(name=name, image_file=image_file, year_heads=year_heads,
+                                              year_rows=year_rows, city_tables=city_tables)
@@ -274,6 +274,7 @@ class InputConnect:
         Args:
             vacancy (Vacancy): объект класса Vacancy
         """
+        # здесь дата публикации уже заменена годом, поэтому месячные курсы (task3.CurrencyRates) не используются
         rate = currency_to_rub[vacancy.salary_currency]
         return int((vacancy.salary_from * rate + vacancy.salary_to * rate) / 2)
 
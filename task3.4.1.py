@@ -1,31 +1,39 @@
 import pandas as pd
 import math
+import columnar_cache
 
 
-def convert_currency(string, df_currency):
-    if pd.isnull(string):
-        return string
-    arr = string.split()
-    if df_currency.columns.__contains__(arr[1]):
-        date = arr[2]
-        course = df_currency[df_currency["date"] == date[:7]][arr[1]].values
-        if not math.isnan(course[0]):
-            return round(float(arr[0]) * course[0])
-    return arr[0]
+def get_rates(dataframe_curr):
+    rates = dataframe_curr.melt(id_vars="date", var_name="salary_currency", value_name="rate")
+    return rates.set_index(["date", "salary_currency"])["rate"]
 
 
-def convert_currencies_in_file():
+def convert_salaries(dataframe, rates):
+    # как и прежний построчный перевод (benchmark.convert_currency): без валюты зарплата пустая, без курса за месяц остается средняя зарплата
+    salary = dataframe[["salary_from", "salary_to"]].mean(axis=1)
+    keys = pd.MultiIndex.from_arrays([dataframe["published_at"].str[:7], dataframe["salary_currency"]])
+    positions = rates.index.get_indexer(keys)
+    rate = rates.to_numpy()[positions]
+    rate[positions == -1] = math.nan
+    converted = (salary * rate).round()
+    is_converted = converted.notna()
+    result = salary.astype(object)
+    result[is_converted] = converted[is_converted].astype("int64").astype(object)
+    result[dataframe["salary_currency"].isna()] = math.nan
+    return result
+
+
+def convert_currencies_in_file(chunksize=100000):
     file_name = "vacancies_dif_currencies.csv"
     file_currencies = "currencies_years.csv"
-    dataframe = pd.read_csv(file_name)
-    dataframe_curr = pd.read_csv(file_currencies)
-    dataframe.insert(1, "salary", None)
-    dataframe.assign(salary=lambda x: x.salary_from)
-    dataframe["salary"] = dataframe[["salary_from", "salary_to"]].mean(axis=1)
-    dataframe["salary"] = dataframe["salary"].astype(str) + " " + + dataframe["salary_currency"] + " " + dataframe["published_at"]
-    dataframe["salary"] = dataframe["salary"].apply(lambda x: convert_currency(x, dataframe_curr))
-    dataframe = dataframe.drop(columns=['salary_from', 'salary_to', 'salary_currency'])
-    dataframe.to_csv("converted_dataframe.csv", index=False)
-
-
-convert_currencies_in_file()
\ No newline at end of file
+    rates = get_rates(pd.read_csv(file_currencies))
+    # файл читается и записывается частями, в памяти одновременно не больше chunksize вакансий
+    with open("converted_dataframe.csv", "w", encoding="utf-8", newline="") as file:
+        for i, dataframe in enumerate(columnar_cache.iter_csv(file_name, chunksize)):
+            dataframe.insert(1, "salary", convert_salaries(dataframe, rates))
+            dataframe = dataframe.drop(columns=['salary_from', 'salary_to', 'salary_currency'])
+            dataframe.to_csv(file, index=False, header=i == 0)
+
+
+if __name__ == "__main__":
+    convert_currencies_in_file()
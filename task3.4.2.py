@@ -6,7 +6,8 @@ import matplotlib.pyplot as plt
 import numpy as np
 from jinja2 import Environment, FileSystemLoader
 import pdfkit
-import pandas as pd
+import sys
+import columnar_cache
 
 # currency_to_rub = {
 #     "AZN": 35.68,
@@ -44,7 +45,7 @@ class InputConnect:
 
     @staticmethod
     def print_data(self, data: DataSet):
-        df = pd.read_csv(data.file_name)
+        df = columnar_cache.read_csv(data.file_name)
         df['salary'] = df['salary'].fillna(0)
         df['salary'] = df['salary'].astype("int64")
         df["published_at"] = df["published_at"].apply(lambda x: int(x[:4]))
@@ -57,6 +58,35 @@ class InputConnect:
             data.salary_by_profession[year] = int(df[df_vacancy & filter_by_year]["salary"].mean())
             data.vacancies_count_by_profession[year] = len(df[df_vacancy & filter_by_year])
 
+    @staticmethod
+    def print_data_by_chunks(self, data: DataSet, chunksize):
+        # в памяти одна часть файла и суммы зарплат с количествами вакансий по годам
+        totals_by_year, totals_by_profession = {}, {}
+        for df in columnar_cache.iter_csv(data.file_name, chunksize):
+            df['salary'] = df['salary'].fillna(0).astype("int64")
+            df["published_at"] = df["published_at"].str[:4].astype("int64")
+            df_vacancy = df["name"].str.contains(self.profession_name, regex=False, na=False)
+            InputConnect.add_year_totals(totals_by_year, totals_by_profession,
+                                         df.groupby(["published_at", df_vacancy], sort=False)["salary"])
+        InputConnect.set_year_totals(data, totals_by_year, totals_by_profession)
+
+    @staticmethod
+    def set_year_totals(data: DataSet, totals_by_year, totals_by_profession):
+        for year, (salary_sum, salary_count) in totals_by_year.items():
+            profession_sum, profession_count = totals_by_profession.get(year, (0, 0))
+            data.salary_by_year[year] = int(salary_sum / salary_count)
+            data.vacancies_count_by_year[year] = salary_count
+            data.salary_by_profession[year] = int(profession_sum / profession_count) if profession_count else 0
+            data.vacancies_count_by_profession[year] = profession_count
+
+    @staticmethod
+    def add_year_totals(totals_by_year, totals_by_profession, grouped_salary):
+        for (year, is_match), salary_sum, salary_count in grouped_salary.agg(["sum", "count"]).itertuples():
+            totals = [totals_by_year, totals_by_profession] if is_match else [totals_by_year]
+            for year_totals in totals:
+                previous_sum, previous_count = year_totals.get(year, (0, 0))
+                year_totals[year] = (previous_sum + int(salary_sum), previous_count + int(salary_count))
+
 
 class Report:
     @staticmethod
@@ -130,7 +160,11 @@ class Report:
         pdfkit.from_string(pdf_template, 'report.pdf', configuration=config, options={"enable-local-file-access": ""})
 
 
-input_data = InputConnect()
-data = DataSet(input_data.file_name)
-InputConnect.print_data(input_data, data)
-Report.generate_pdf(input_data.profession_name, data)
\ No newline at end of file
+if __name__ == "__main__":
+    input_data = InputConnect()
+    data = DataSet(input_data.file_name)
+    if "--chunksize" in sys.argv:
+        InputConnect.print_data_by_chunks(input_data, data, int(sys.argv[sys.argv.index("--chunksize") + 1]))
+    else:
+        InputConnect.print_data(input_data, data)
+    Report.generate_pdf(input_data.profession_name, data)
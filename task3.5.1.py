@@ -1,13 +1,13 @@
-import pandas as pd
-import sqlite3
+import columnar_cache
+import db_backend
 
 
 def create_table():
-    sqlite_connection = sqlite3.connect('database1.db')
-    cursor = sqlite_connection.cursor()
-    df = pd.read_csv("converted_dataframe.csv")
-    df.to_sql('exchange_rates', sqlite_connection, if_exists='replace', index=False)
-    cursor.close()
+    sqlite_connection = db_backend.connect('database1.db')
+    frames = columnar_cache.iter_csv("converted_dataframe.csv", 100000,
+                                     columns=["name", "salary", "area_name", "published_at"])
+    db_backend.update(sqlite_connection, (row for df in frames for row in df.itertuples(index=False, name=None)))
+    sqlite_connection.close()
 
 
-create_table()
\ No newline at end of file
+create_table()
@@ -1,17 +1,19 @@
 import csv
+import hashlib
+import itertools
+import json
+import os
+from array import array
 from datetime import datetime
 import re
+import shutil
 import math
-from openpyxl import Workbook
-from openpyxl.styles import Font, Border, Side
-import openpyxl.utils.cell
-import matplotlib.pyplot as plt
+import sys
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
-from jinja2 import Environment, FileSystemLoader
-import pdfkit
-import pandas as pd
-import arrow
-import maya
+import profiler
+# pandas и pyarrow (columnar_cache) и зависимости отчетов (openpyxl, matplotlib, reportlab, jinja2, pdfkit)
+# импортируются в методах, которые их используют: импорт task3 для расчета статистики и тестов не загружает их
 
 currency_to_rub = {
     "AZN": 35.68,
@@ -37,6 +39,8 @@ class Vacancy:
          area_name (str): Страна
          published_at (str): Дата публикации
     """
+    __slots__ = ("name", "salary_from", "salary_to", "salary_currency", "area_name", "published_at")
+
     def __init__(self, items):
         """Инициализирует объект Vacancy, выполняет конвертацию границ оклада в float
         Args:
@@ -64,16 +68,351 @@ class Vacancy:
         self.published_at = items[5]
 
 
+class CurrencyRates:
+    """Класс, хранящий месячные курсы валют из currencies_years.csv в плотной таблице (месяц x валюта).
+    Курсы, которых нет в файле, и курсы за месяцы вне таблицы берутся из currency_to_rub
+    Attributes:
+        file_name (str): Имя csv-файла с курсами валют
+        first_month (int): Номер первого месяца таблицы (год * 12 + месяц - 1)
+        codes (dict): Номер столбца таблицы для каждой валюты
+        rates (numpy.ndarray): Курсы валют по месяцам
+        static_rates (numpy.ndarray): Курсы из currency_to_rub в порядке столбцов таблицы
+    """
+    def __init__(self, file_name="currencies_years.csv"):
+        """Загружает курсы валют из csv-файла
+        Args:
+            file_name (str): Имя csv-файла с курсами валют по месяцам
+        """
+        self.file_name = file_name
+        with open(file_name, encoding="utf_8_sig") as file_csv:
+            reader_csv = csv.reader(file_csv)
+            list_naming = next(reader_csv)
+            rows = [row for row in reader_csv if len(row) == len(list_naming)]
+        currencies = list(currency_to_rub) + [currency for currency in list_naming[1:] if currency not in currency_to_rub]
+        self.codes = {currency: code for code, currency in enumerate(currencies)}
+        self.static_rates = np.array([currency_to_rub.get(currency, math.nan) for currency in currencies])
+        months = [CurrencyRates.get_month(row[0]) for row in rows]
+        self.first_month = min(months, default=0)
+        self.rates = np.tile(self.static_rates, (max(months, default=-1) - self.first_month + 1, 1))
+        for month, row in zip(months, rows):
+            for currency, value in zip(list_naming[1:], row[1:]):
+                if value != "":
+                    self.rates[month - self.first_month, self.codes[currency]] = float(value)
+
+    @staticmethod
+    def get_month(date):
+        """Возвращает номер месяца публикации вакансии
+        Args:
+            date (str): Дата публикации или месяц в формате ГГГГ-ММ
+        Returns:
+            int: Год * 12 + месяц - 1
+        >>> CurrencyRates.get_month("2022-05-31T17:32:31+0300")
+        24268
+        """
+        return int(date[0:4]) * 12 + int(date[5:7]) - 1
+
+    def get_rate(self, currency, date):
+        """Возвращает курс валюты в месяц публикации вакансии
+        Args:
+            currency (str): Валюта оклада
+            date (str): Дата публикации
+        Returns:
+            float: Курс валюты в рублях
+        Raises:
+            ValueError: Дата публикации заменена годом (например, у вакансии из VacancyColumns): месячный курс
+                определить нельзя, а курс currency_to_rub разошелся бы с VacancyStatistics.from_columns
+        """
+        if not isinstance(date, str):
+            raise ValueError(f"Для месячного курса нужна дата публикации, а не год: {date}")
+        index = CurrencyRates.get_month(date) - self.first_month
+        if 0 <= index < len(self.rates):
+            return self.rates[index, self.codes[currency]]
+        return currency_to_rub[currency]
+
+    def get_rates(self, codes, months):
+        """Векторный вариант get_rate
+        Args:
+            codes (numpy.ndarray): Номера столбцов валют в таблице
+            months (numpy.ndarray): Номера месяцев публикации, 0 - месяц неизвестен
+        Returns:
+            numpy.ndarray: Курсы валют в рублях
+        """
+        index = months.astype(np.int64) - self.first_month
+        inside = (index >= 0) & (index < len(self.rates))
+        rates = self.static_rates[codes]
+        rates[inside] = self.rates[index[inside], codes[inside]]
+        return rates
+
+
+class VacancyColumns:
+    """Колоночное хранилище вакансий. Числовые параметры хранятся в массивах array,
+    строковые параметры кодируются целыми числами по словарю значений
+    Attributes:
+        salary_from (array): Нижние границы вилки оклада
+        salary_to (array): Верхние границы вилки оклада
+        year (array): Годы публикации
+        month (array): Номера месяцев публикации (год * 12 + месяц - 1), 0 - месяц неизвестен
+        name (array): Коды названий вакансий в списке names
+        salary_currency (array): Коды валют в списке currencies
+        area_name (array): Коды городов в списке area_names
+        names (list): Различные названия вакансий
+        currencies (list): Различные валюты
+        area_names (list): Различные города
+    """
+    def __init__(self):
+        """Инициализирует пустой объект VacancyColumns
+        >>> len(VacancyColumns())
+        0
+        """
+        self.salary_from = array("d")
+        self.salary_to = array("d")
+        self.year = array("H")
+        self.month = array("H")
+        self.name = array("i")
+        self.salary_currency = array("i")
+        self.area_name = array("i")
+        self.names = []
+        self.currencies = []
+        self.area_names = []
+        self.codes = {"name": ({}, self.names), "salary_currency": ({}, self.currencies),
+                      "area_name": ({}, self.area_names)}
+
+    def get_code(self, column, value):
+        """Возвращает код значения строкового параметра, добавляя значение в словарь при первой встрече
+        Args:
+            column (str): Название параметра
+            value (str): Значение параметра
+        Returns:
+            int: Код значения
+        """
+        codes, values = self.codes[column]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(values)
+            values.append(value)
+        return code
+
+    def append(self, vacancy):
+        """Добавляет вакансию в хранилище
+        Args:
+            vacancy (Vacancy): Вакансия, дата публикации которой задана строкой или годом
+        >>> columns = VacancyColumns()
+        >>> columns.append(Vacancy(['Программист', 70000, 500000, 'RUR', 'Москва', '2022-05-31T17:32:31+0300']))
+        >>> columns[0].published_at, columns[0].salary_to, columns.area_names
+        (2022, 500000.0, ['Москва'])
+        """
+        year, month = vacancy.published_at, 0
+        if not isinstance(year, int):
+            year, month = DataSet.get_year_optimized(year), CurrencyRates.get_month(year)
+        self.salary_from.append(vacancy.salary_from)
+        self.salary_to.append(vacancy.salary_to)
+        self.year.append(year)
+        self.month.append(month)
+        self.name.append(self.get_code("name", vacancy.name))
+        self.salary_currency.append(self.get_code("salary_currency", vacancy.salary_currency))
+        self.area_name.append(self.get_code("area_name", vacancy.area_name))
+
+    @staticmethod
+    def from_table(table):
+        """Создает хранилище из таблицы pyarrow, прочитанной из колоночного кэша
+        Args:
+            table (pyarrow.Table): Вакансии со столбцами исходного csv-файла
+        Returns:
+            VacancyColumns: Колоночное хранилище вакансий
+        """
+        columns = VacancyColumns()
+        for column, (codes, values) in columns.codes.items():
+            encoded = table.column(column).combine_chunks().dictionary_encode()
+            values.extend(encoded.dictionary.to_pylist())
+            codes.update((value, code) for code, value in enumerate(values))
+            getattr(columns, column).frombytes(encoded.indices.to_numpy(zero_copy_only=False).astype("i").tobytes())
+        for column in ("salary_from", "salary_to"):
+            getattr(columns, column).frombytes(table.column(column).to_numpy().astype("d").tobytes())
+        year_month = np.char.replace(table.column("published_at").to_numpy(zero_copy_only=False).astype("U7"),
+                                     "-", "").astype(np.int64)
+        columns.year.frombytes((year_month // 100).astype("H").tobytes())
+        columns.month.frombytes((year_month // 100 * 12 + year_month % 100 - 1).astype("H").tobytes())
+        return columns
+
+    def __len__(self):
+        return len(self.year)
+
+    def __getitem__(self, index):
+        """Создает объект Vacancy для вакансии с указанным номером. Дата публикации заменяется годом,
+        поэтому перевод валют по месячным курсам выполняется по самому хранилищу (VacancyStatistics.from_columns)
+        Args:
+            index (int): Номер вакансии
+        Returns:
+            Vacancy: Вакансия
+        """
+        return Vacancy([self.names[self.name[index]], self.salary_from[index], self.salary_to[index],
+                        self.currencies[self.salary_currency[index]], self.area_names[self.area_name[index]],
+                        self.year[index]])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def get_name_index(self, file_name, index_name="name_index.npz"):
+        """Возвращает индекс названий вакансий хранилища, построенный один раз и сохраненный на диск
+        Args:
+            file_name (str): Имя csv-файла, из которого загружено хранилище
+            index_name (str): Имя файла индекса
+        Returns:
+            NameIndex: Индекс
+        """
+        return NameIndex.get_index(file_name, self.names, self.name, index_name)
+
+
+class NameIndex:
+    """Инвертированный индекс триграмм по различным названиям вакансий. Поиск подстроки пересекает списки
+    названий, содержащих каждую триграмму подстроки, и проверяет только оставшихся кандидатов
+    Attributes:
+        names (list): Различные названия вакансий
+        trigrams (dict): Номер списка названий для каждой триграммы
+        postings (numpy.ndarray): Коды названий всех списков подряд, в каждом списке по возрастанию
+        offsets (numpy.ndarray): Границы списков в postings
+        row_order (numpy.ndarray): Номера строк, упорядоченные по коду названия
+        row_offsets (numpy.ndarray): Границы строк каждого кода названия в row_order
+        sources (dict): Размер и время изменения файла вакансий, по которому построен индекс
+    """
+    def __init__(self, names, trigrams, postings, offsets, row_order, row_offsets, sources=None):
+        """Инициализирует объект NameIndex
+        Args:
+            names (list): Различные названия вакансий
+            trigrams (list): Триграммы в порядке списков в postings
+            postings (numpy.ndarray): Коды названий всех списков подряд
+            offsets (numpy.ndarray): Границы списков в postings
+            row_order (numpy.ndarray): Номера строк, упорядоченные по коду названия
+            row_offsets (numpy.ndarray): Границы строк каждого кода названия в row_order
+            sources (dict): Размер и время изменения файла вакансий
+        """
+        self.names = names
+        self.trigrams = {trigram: number for number, trigram in enumerate(trigrams)}
+        self.postings = postings
+        self.offsets = offsets
+        self.row_order = row_order
+        self.row_offsets = row_offsets
+        self.sources = sources or {}
+
+    @staticmethod
+    def build(names, codes, sources=None):
+        """Строит индекс
+        Args:
+            names (list): Различные названия вакансий
+            codes (array): Код названия для каждой строки (вакансии или ячейки куба)
+            sources (dict): Размер и время изменения файла вакансий
+        Returns:
+            NameIndex: Индекс
+        >>> index = NameIndex.build(["Программист", "Аналитик", "Программист 1С"], [0, 1, 2, 0])
+        >>> index.get_names("грамм").tolist(), index.get_rows("1С").tolist()
+        ([0, 2], [2])
+        """
+        postings = {}
+        for code, name in enumerate(names):
+            for trigram in {name[i:i + 3] for i in range(len(name) - 2)}:
+                postings.setdefault(trigram, []).append(code)
+        codes = np.asarray(codes, dtype=np.int64)
+        return NameIndex(list(names), list(postings),
+                         np.fromiter((code for posting in postings.values() for code in posting), dtype=np.int32),
+                         np.cumsum([0] + [len(posting) for posting in postings.values()]),
+                         np.argsort(codes, kind="stable"),
+                         np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=len(names))))), sources)
+
+    def get_names(self, substring):
+        """Возвращает коды названий, содержащих подстроку. Подстроки короче трех символов проверяются перебором
+        Args:
+            substring (str): Подстрока названия (название профессии)
+        Returns:
+            numpy.ndarray: Коды названий по возрастанию
+        """
+        if len(substring) < 3:
+            candidates = range(len(self.names))
+        else:
+            postings = []
+            for trigram in {substring[i:i + 3] for i in range(len(substring) - 2)}:
+                number = self.trigrams.get(trigram)
+                if number is None:
+                    return np.array([], dtype=np.int64)
+                postings.append(self.postings[self.offsets[number]:self.offsets[number + 1]])
+            postings.sort(key=len)
+            candidates = postings[0]
+            for posting in postings[1:]:
+                candidates = np.intersect1d(candidates, posting, assume_unique=True)
+        return np.array([code for code in candidates if self.names[code].__contains__(substring)], dtype=np.int64)
+
+    def get_rows(self, substring):
+        """Возвращает номера строк, название которых содержит подстроку
+        Args:
+            substring (str): Подстрока названия (название профессии)
+        Returns:
+            numpy.ndarray: Номера строк по возрастанию, то есть в порядке следования в данных
+        """
+        rows = [self.row_order[self.row_offsets[code]:self.row_offsets[code + 1]] for code in self.get_names(substring)]
+        return np.sort(np.concatenate(rows)) if rows else np.array([], dtype=np.int64)
+
+    @staticmethod
+    def get_index(file_name, names, codes, index_name):
+        """Загружает индекс с диска или, если он построен по другой версии файла вакансий или другому порядку строк
+        (например, по кэшу, где вакансии сгруппированы по годам), строит и сохраняет заново
+        Args:
+            file_name (str): Имя csv-файла с вакансиями
+            names (list): Различные названия вакансий
+            codes (array): Код названия для каждой строки
+            index_name (str): Имя файла индекса
+        Returns:
+            NameIndex: Индекс
+        """
+        import columnar_cache
+        codes = np.asarray(codes, dtype=np.int64)
+        sources = {"vacancies": columnar_cache.get_source_state(file_name), "rows": len(codes),
+                   "codes": hashlib.sha256(codes.tobytes()).hexdigest()}
+        if os.path.exists(index_name):
+            index = NameIndex.load(index_name)
+            if index.sources == sources and index.names == list(names):
+                return index
+        index = NameIndex.build(names, codes, sources)
+        index.save(index_name)
+        return index
+
+    def save(self, index_name):
+        """Сохраняет индекс в npz-файл. Названия, триграммы и сведения о файле вакансий хранятся в виде json
+        Args:
+            index_name (str): Имя файла индекса
+        """
+        dictionary = json.dumps({"names": self.names, "trigrams": list(self.trigrams), "sources": self.sources},
+                                ensure_ascii=False).encode("utf-8")
+        with open(index_name + ".tmp", "wb") as index_file:
+            np.savez(index_file, postings=self.postings, offsets=self.offsets, row_order=self.row_order,
+                     row_offsets=self.row_offsets, dictionary=np.frombuffer(dictionary, dtype=np.uint8))
+        os.replace(index_name + ".tmp", index_name)
+
+    @staticmethod
+    def load(index_name):
+        """Загружает индекс из npz-файла
+        Args:
+            index_name (str): Имя файла индекса
+        Returns:
+            NameIndex: Индекс
+        """
+        with np.load(index_name) as index_file:
+            dictionary = json.loads(index_file["dictionary"].tobytes().decode("utf-8"))
+            return NameIndex(dictionary["names"], dictionary["trigrams"], index_file["postings"],
+                             index_file["offsets"], index_file["row_order"], index_file["row_offsets"],
+                             dictionary["sources"])
+
+
 class DataSet:
     """Класс, подготавливающий данные из csv-файла для передачи в класс Vacancy
     Attributes:
         file_name (str): Имя файла
         vacancies (list): Список вакансий
     """
-    def __init__(self, file_name):
+    def __init__(self, file_name, vacancies=None):
         """Инициализирует объект DataSet
         Args:
             file_name (str): Имя файла
+            vacancies (iterable): Вакансии (список или поток вакансий), по умолчанию пустой список
         >>> type(DataSet("file_name")).__name__
         'DataSet'
         >>> DataSet("vacancies.csv").file_name
@@ -82,7 +421,7 @@ class DataSet:
         []
         """
         self.file_name = file_name
-        self.vacancies = []
+        self.vacancies = [] if vacancies is None else vacancies
 
     @staticmethod
     def get_dataset(file_name):
@@ -90,36 +429,254 @@ class DataSet:
         Args:
             file_name (str): Имя csv-файла
         Returns:
-            list: Список вакансий
-        """
-        def get_files_by_years():
-            """Формирует отдельные csv-файлы с вакансиями по годам в папке csv_files_by_years"""
-            pd.set_option("expand_frame_repr", False)
-            df = pd.read_csv("vacancies_by_year.csv")
-            df["years"] = df["published_at"].apply(lambda s: s[:4])
-
-            years = df["years"].unique()
-            for year in years:
-                data = df[df["years"] == year]
-                data[["name", "salary_from", "salary_to", "salary_currency",
-                      "area_name", "published_at"]] \
-                    .to_csv(rf"csv_files_by_years\{year}.csv", index=False)
-
-        get_files_by_years()
-        data = DataSet.csv_reader(file_name)
-        data_array = DataSet.csv_filer(data[0], data[1])
-        dataset = DataSet(file_name)
-        for item in data_array:
-            vacancy_items = [f"{item['name']}", f"{item['salary_from']}", f"{item['salary_to']}",
-                             f"{item['salary_currency']}", f"{item['area_name']}", f"{item['published_at']}"]
-            vacancy = Vacancy(vacancy_items)
+            DataSet: Объект DataSet, вакансии которого хранятся в VacancyColumns
+        """
+        DataSet.get_files_by_years()
+        dataset = DataSet(file_name, VacancyColumns())
+        for vacancy in DataSet.iter_vacancies(file_name):
             # vacancy.published_at = DataSet.get_year(vacancy.published_at)
             # vacancy.published_at = DataSet.get_year_with_arrow(vacancy.published_at)
             # vacancy.published_at = DataSet.get_year_with_maya(vacancy.published_at)
-            vacancy.published_at = DataSet.get_year_optimized(vacancy.published_at)
+            # год и месяц публикации берутся из даты в VacancyColumns.append с помощью get_year_optimized
             dataset.vacancies.append(vacancy)
         return dataset
 
+    @staticmethod
+    def get_files_by_years(source_name="vacancies_by_year.csv", directory="csv_files_by_years"):
+        """Формирует отдельные csv-файлы с вакансиями по годам в папке directory за один потоковый проход.
+        Сведения об исходном файле (размер, время изменения, sha256 обработанной части) и о записях каждого года
+        хранятся в manifest.json. Если исходный файл не изменился, разбиение пропускается; если к нему только
+        дописаны строки, в файлы по годам дописываются только новые записи. Значения копируются из исходного файла
+        без преобразования. Строка без перевода строки в конце файла считается недописанной и обрабатывается
+        при следующем вызове, когда файл будет дописан
+        Args:
+            source_name (str): Имя исходного csv-файла
+            directory (str): Папка с csv-файлами по годам
+        Returns:
+            dict: Содержимое manifest.json
+        """
+        columns = ["name", "salary_from", "salary_to", "salary_currency", "area_name", "published_at"]
+        manifest_name = os.path.join(directory, "manifest.json")
+        source_stat = os.stat(source_name)
+        manifest = None
+        if os.path.exists(manifest_name):
+            with open(manifest_name, encoding="utf_8") as manifest_file:
+                manifest = json.load(manifest_file)
+        if manifest is not None and manifest["size"] == source_stat.st_size \
+                and manifest["mtime"] == source_stat.st_mtime_ns:
+            return manifest
+
+        file_hash = hashlib.sha256()
+        with open(source_name, "rb") as file_csv:
+            header = file_csv.readline()
+            file_hash.update(header)
+            if manifest is not None and manifest["offset"] <= source_stat.st_size:
+                remaining = manifest["offset"] - len(header)
+                while remaining > 0:
+                    block = file_csv.read(min(remaining, 1 << 20))
+                    if not block:
+                        break
+                    file_hash.update(block)
+                    remaining -= len(block)
+                if file_hash.hexdigest() != manifest["sha256"]:
+                    manifest = None
+            else:
+                manifest = None
+            if manifest is None:
+                for year in os.listdir(directory) if os.path.isdir(directory) else []:
+                    if year.endswith(".csv"):
+                        os.remove(os.path.join(directory, year))
+                os.makedirs(directory, exist_ok=True)
+                file_hash = hashlib.sha256(header)
+                file_csv.seek(len(header))
+                manifest = {"source": source_name, "offset": len(header), "years": {}}
+
+            def iter_source_lines():
+                """Читает полные строки исходного файла, запоминая их до окончания записи csv"""
+                for line in file_csv:
+                    if not line.endswith(b"\n"):
+                        return
+                    record_lines.append(line)
+                    yield line.decode("utf_8")
+
+            naming = next(csv.reader([header.decode("utf_8_sig")]))
+            indexes = [naming.index(column) for column in columns]
+            record_lines = []
+            files, writers = {}, {}
+            try:
+                for row in csv.reader(iter_source_lines()):
+                    # sha256 и позиция обработанной части учитывают только полностью прочитанные записи
+                    row_offset = manifest["offset"]
+                    for line in record_lines:
+                        file_hash.update(line)
+                        manifest["offset"] += len(line)
+                    record_lines.clear()
+                    if len(row) != len(naming) or len(row[indexes[-1]]) < 4:
+                        continue
+                    year = row[indexes[-1]][:4]
+                    if year not in writers:
+                        file_name = os.path.join(directory, f"{year}.csv")
+                        is_new = not os.path.exists(file_name)
+                        files[year] = open(file_name, "a", encoding="utf_8", newline="")
+                        writers[year] = csv.writer(files[year], lineterminator="\n")
+                        if is_new:
+                            writers[year].writerow(columns)
+                    writers[year].writerow([row[index] for index in indexes])
+                    year_info = manifest["years"].setdefault(year, {"rows": 0, "first_offset": row_offset})
+                    year_info["rows"] += 1
+                    year_info["last_offset"] = row_offset
+            finally:
+                for file in files.values():
+                    file.close()
+
+        manifest.update({"size": source_stat.st_size, "mtime": source_stat.st_mtime_ns,
+                         "sha256": file_hash.hexdigest()})
+        with open(manifest_name, "w", encoding="utf_8") as manifest_file:
+            json.dump(manifest, manifest_file, indent=4)
+        return manifest
+
+    @staticmethod
+    @profiler.profile("reading", lambda dataset, *args: len(dataset.vacancies))
+    def get_dataset_from_cache(file_name, years=None):
+        """Формирует данные из колоночного кэша csv-файла, открывая только папки выбранных лет
+        Args:
+            file_name (str): Имя csv-файла
+            years (iterable): Годы публикации, по умолчанию все годы
+        Returns:
+            DataSet: Объект DataSet, вакансии которого хранятся в VacancyColumns
+        """
+        import columnar_cache
+        return DataSet(file_name, VacancyColumns.from_table(columnar_cache.read_table(file_name, years=years)))
+
+    @staticmethod
+    def get_columns(file_name):
+        """Загружает все вакансии в колоночное хранилище: из колоночного кэша, если он актуален, иначе из csv-файла
+        Args:
+            file_name (str): Имя csv-файла
+        Returns:
+            VacancyColumns: Колоночное хранилище вакансий
+        """
+        import columnar_cache
+        if columnar_cache.is_fresh(file_name, "vacancies"):
+            return DataSet.get_dataset_from_cache(file_name).vacancies
+        columns = VacancyColumns()
+        for vacancy in DataSet.iter_vacancies(file_name):
+            columns.append(vacancy)
+        return columns
+
+    @staticmethod
+    def convert_to_cache(file_name, rows_count=100000):
+        """Записывает очищенные вакансии csv-файла в колоночный кэш, разбитый по годам
+        Args:
+            file_name (str): Имя csv-файла
+            rows_count (int): Количество вакансий в одной части кэша
+        Returns:
+            dict: Описание кэша
+        """
+        import columnar_cache
+
+        def iter_parts():
+            part = {name: [] for name in Vacancy.__slots__}
+            for vacancy in DataSet.iter_vacancies(file_name):
+                for name, values in part.items():
+                    values.append(getattr(vacancy, name))
+                if len(part["name"]) == rows_count:
+                    yield part
+                    part = {name: [] for name in Vacancy.__slots__}
+            if part["name"]:
+                yield part
+
+        return columnar_cache.convert(file_name, iter_parts(), kind="vacancies")
+
+    @staticmethod
+    def get_dataset_stream(file_name):
+        """Формирует данные в виде потока вакансий, не загружая весь файл в память
+        Args:
+            file_name (str): Имя csv-файла
+        Returns:
+            DataSet: Объект DataSet, вакансии которого считываются из файла по мере обхода
+        """
+        return DataSet(file_name, DataSet.iter_vacancies(file_name))
+
+    @staticmethod
+    def iter_vacancies(file_name, start=None, end=None, cleaner=None):
+        """Построчно считывает вакансии из csv-файла. Дата публикации остается в исходном виде
+        Args:
+            file_name (str): Имя csv-файла
+            start (int): Байтовая позиция начала первой считываемой записи, по умолчанию - сразу после заголовка
+            end (int): Байтовая позиция, на которой чтение заканчивается, по умолчанию - конец файла
+            cleaner (CellCleaner): Очистка ячеек, в которой накапливается количество измененных ячеек
+        Yields:
+            Vacancy: Очередная вакансия с удаленными html-тегами
+        """
+        cleaner = CellCleaner() if cleaner is None else cleaner
+        # при включенном замере каждая строка учитывается в этапах чтения, очистки и создания вакансии
+        clean_row = profiler.timed("cleaning", cleaner.clean_row)
+        create_vacancy = profiler.timed("construction", Vacancy)
+        with open(file_name, "rb") as file_csv:
+            reader_csv = csv.reader(DataSet.iter_lines(file_csv))
+            list_naming = next(reader_csv, [])
+            if start is not None:
+                file_csv.seek(start)
+                reader_csv = csv.reader(DataSet.iter_lines(file_csv, end))
+            for row in profiler.timed_iter("reading", reader_csv):
+                if len(row) != len(list_naming) or row.__contains__(""):
+                    continue
+                item = clean_row(list_naming, row)
+                yield create_vacancy([item["name"], item["salary_from"], item["salary_to"],
+                                      item["salary_currency"], item["area_name"], item["published_at"]])
+
+    @staticmethod
+    def iter_lines(file_csv, end=None):
+        """Построчно читает двоичный файл с текущей позиции до байтовой позиции end
+        Args:
+            file_csv (BufferedReader): Файл, открытый в двоичном режиме
+            end (int): Байтовая позиция, на которой чтение заканчивается
+        Yields:
+            str: Очередная строка файла
+        """
+        position = file_csv.tell()
+        for line in file_csv:
+            if end is not None and position >= end:
+                return
+            position += len(line)
+            yield line.decode("utf_8_sig")
+
+    @staticmethod
+    def get_chunks(file_name, chunks_count):
+        """Делит csv-файл на байтовые диапазоны примерно равного размера. Границы диапазонов совпадают с границами
+        записей: перевод строки внутри поля в кавычках границей не считается
+        Args:
+            file_name (str): Имя csv-файла
+            chunks_count (int): Желаемое количество диапазонов
+        Returns:
+            list: Пары (начало, конец) байтовых позиций записей, заголовок в диапазоны не входит
+        """
+        block_size = 1 << 20
+        size = os.path.getsize(file_name)
+        with open(file_name, "rb") as file_csv:
+            header_size = len(file_csv.readline())
+            boundaries = [header_size]
+            block_start, block, quotes = header_size, file_csv.read(block_size), 0
+            for i in range(1, chunks_count):
+                target = max(header_size + (size - header_size) * i // chunks_count, boundaries[-1])
+                while block:
+                    if target >= block_start + len(block):
+                        quotes += block.count(b'"')
+                        block_start += len(block)
+                        block = file_csv.read(block_size)
+                        continue
+                    position = block.find(b"\n", target - block_start)
+                    if position == -1:
+                        target = block_start + len(block)
+                    elif (quotes + block.count(b'"', 0, position)) % 2 == 0:
+                        boundaries.append(block_start + position + 1)
+                        break
+                    else:
+                        target = block_start + position + 1
+        boundaries.append(size)
+        return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if start < end]
+
     # @staticmethod
     # def get_year(date):
     #     """Форматирует дату публикации вакансии
@@ -167,6 +724,7 @@ class DataSet:
         return int(date[0:4])
 
     @staticmethod
+    @profiler.profile("reading", lambda result, *args: len(result[1]))
     def csv_reader(file_name):
         """Считывает данные из csv-файла
         Args:
@@ -181,11 +739,12 @@ class DataSet:
         return list_data[0], [x for x in list_data[1:] if len(x) == len(list_data[0]) and not x.__contains__("")]
 
     @staticmethod
-    def csv_filer(list_naming, reader):
+    def csv_filer(list_naming, reader, cleaner=None):
         """Формирует список вакансий
         Args:
             list_naming (list): Названия параметров вакансий
             reader (list): Параматры вакансий
+            cleaner (CellCleaner): Очистка ячеек, по умолчанию с правилами CellCleaner.column_rules
         Returns:
             list: Список всех вакансий с названиями их параметров
         >>> DataSet("file_name").csv_filer(['Название', 'Описание', 'Средняя з/п'], [['Программист', 'Middle Frontend', '150000']])
@@ -193,14 +752,9 @@ class DataSet:
         >>> DataSet("file_name").csv_filer([], [[]])
         [{}]
         """
-        data_vacancies_local = []
-        for vacancy in reader:
-            data_dictionary = {}
-            for title in range(len(vacancy)):
-                items = DataSet.remove_html_tags(vacancy[title].split('\n'))
-                data_dictionary[list_naming[title]] = items[0] if len(items) == 1 else "; ".join(items)
-            data_vacancies_local.append(data_dictionary)
-        return data_vacancies_local
+        cleaner = CellCleaner() if cleaner is None else cleaner
+        with profiler.stage("cleaning", len(reader)):
+            return [cleaner.clean_row(list_naming, vacancy) for vacancy in reader]
 
     @staticmethod
     def remove_html_tags(vacancy):
@@ -217,15 +771,87 @@ class DataSet:
         ['', '']
         """
         for title in range(len(vacancy)):
-            vacancy[title] = " ".join(re.sub(r"\<[^>]*\>", "", vacancy[title]).split())
+            if "<" in vacancy[title]:
+                vacancy[title] = CellCleaner.html_tag.sub("", vacancy[title])
+            if not CellCleaner.has_single_spaces(vacancy[title]):
+                vacancy[title] = " ".join(vacancy[title].split())
         return vacancy
 
 
+class CellCleaner:
+    """Класс, очищающий ячейки csv-файла по правилам, заданным для каждого столбца.
+    Ячейки без "<" и без лишних пробельных символов возвращаются без изменений и без применения регулярных выражений
+    Attributes:
+        rules (dict): Правила очистки столбцов: "html" - удаление html-тегов и лишних пробелов,
+            "spaces" - только удаление лишних пробелов. Для остальных столбцов используется "html"
+        rewritten_count (int): Количество ячеек, значение которых изменилось при очистке
+    """
+    html_tag = re.compile(r"<[^>]*>")
+    column_rules = {"salary_from": "spaces", "salary_to": "spaces", "salary_currency": "spaces",
+                    "published_at": "spaces"}
+
+    def __init__(self, rules=None):
+        """Инициализирует объект CellCleaner
+        Args:
+            rules (dict): Правила очистки столбцов, по умолчанию CellCleaner.column_rules
+        """
+        self.rules = CellCleaner.column_rules if rules is None else rules
+        self.rewritten_count = 0
+
+    def clean(self, column, value):
+        """Очищает значение ячейки. Строки многострочной ячейки очищаются отдельно и соединяются через "; "
+        Args:
+            column (str): Название столбца
+            value (str): Значение ячейки
+        Returns:
+            str: Очищенное значение
+        >>> CellCleaner().clean("name", " Программист<br>\\n 1С ")
+        'Программист; 1С'
+        >>> CellCleaner().clean("salary_from", "<100>")
+        '<100>'
+        """
+        if "<" not in value and CellCleaner.has_single_spaces(value):
+            return value
+        items = value.split("\n")
+        if self.rules.get(column, "html") == "html":
+            items = DataSet.remove_html_tags(items)
+        else:
+            items = [" ".join(item.split()) for item in items]
+        cleaned = items[0] if len(items) == 1 else "; ".join(items)
+        if cleaned != value:
+            self.rewritten_count += 1
+        return cleaned
+
+    @staticmethod
+    def has_single_spaces(value):
+        """Проверяет, что " ".join(value.split()) не изменит значение: в нем нет пробельных символов, кроме
+        одиночных пробелов внутри строки. Любой пробельный символ, кроме пробела, не является печатаемым
+        Args:
+            value (str): Значение ячейки
+        Returns:
+            bool: True, если удалять лишние пробелы не нужно
+        >>> CellCleaner.has_single_spaces("Программист 1С"), CellCleaner.has_single_spaces("Программист\\xa01С")
+        (True, False)
+        """
+        return value.isprintable() and "  " not in value and value[:1] != " " and value[-1:] != " "
+
+    def clean_row(self, list_naming, row):
+        """Очищает все ячейки строки csv-файла
+        Args:
+            list_naming (list): Названия столбцов
+            row (list): Значения ячеек
+        Returns:
+            dict: Очищенные значения ячеек по названиям столбцов
+        """
+        return {list_naming[title]: self.clean(list_naming[title], row[title]) for title in range(len(row))}
+
+
 class InputConnect:
     """Класс, отвечающий за сбор статистики по вакансиям. Получает данные от пользователя, передает статистику классу Report
     Attributes:
         file_name (str): Имя файла
         profession_name (str): Название профессии
+        currency_rates (CurrencyRates): Месячные курсы валют, None - используются курсы currency_to_rub
     """
     def __init__(self):
         """Инициализирует объект InputConnect
@@ -236,31 +862,23 @@ class InputConnect:
         # self.profession_name = input("Введите название профессии: ")
         self.file_name = "vacancies_by_year.csv"
         self.profession_name = "Программист"
+        self.currency_rates = CurrencyRates() if os.path.exists("currencies_years.csv") else None
 
     @staticmethod
-    def print_data_dict(self, data: DataSet):
+    def print_data_dict(self, data: DataSet, statistics=None):
         """Выводит на экран статистику о вакансиях
         Args:
             data (DataSet): Список вакансий
+            statistics (VacancyStatistics): Уже собранная статистика. Если не задана, собирается по data.vacancies
         """
-        def get_correct_vacancy_rate(data: DataSet):
-            """Отвечает за правильный рассчет количества вакансий по городам в процентом отношении к общему количеству вакансий
-            Args:
-                data (DataSet): Список вакансий
-            Returns:
-                dict: Отсортированный по убыванию количества вакансий словарь вакансий
-            """
-            data.vacancy_rate_by_city = {x: round(y / len(data.vacancies), 4) for x, y in
-                                         data.vacancy_rate_by_city.items()}
-            data.vacancy_rate_by_city = {k: v for k, v in data.vacancy_rate_by_city.items() if math.floor(v * 100 >= 1)}
-            return dict(sorted(data.vacancy_rate_by_city.items(), key=lambda item: item[1], reverse=True))
-        data.vacancy_rate_by_city = InputConnect.get_vacancy_rate_by_city(data)
-        data.salary_by_city = InputConnect.get_salary_by_city(data)
-        data.vacancy_rate_by_city = get_correct_vacancy_rate(data)
-        data.vacancies_count_by_year = InputConnect.get_vacancies_count_by_year(data, "None")
-        data.salary_by_year = InputConnect.get_salary_by_name(data, "None")
-        data.vacancies_count_by_profession_name = InputConnect.get_vacancies_count_by_year(data, self.profession_name)
-        data.salary_by_profession_name = InputConnect.get_salary_by_name(data, self.profession_name)
+        if statistics is None:
+            statistics = InputConnect.get_statistics(data.vacancies, self.profession_name, self.currency_rates)
+        data.vacancy_rate_by_city = statistics.get_vacancy_rate_by_city()
+        data.salary_by_city = statistics.get_salary_by_city()
+        data.vacancies_count_by_year = statistics.get_vacancies_count_by_year("None")
+        data.salary_by_year = statistics.get_salary_by_name("None")
+        data.vacancies_count_by_profession_name = statistics.get_vacancies_count_by_year(self.profession_name)
+        data.salary_by_profession_name = statistics.get_salary_by_name(self.profession_name)
 
         salary_by_year = data.salary_by_year
         vacs_by_years = data.vacancies_count_by_year
@@ -269,8 +887,9 @@ class InputConnect:
         salary_by_cities = dict(list(data.salary_by_city.items())[:10])
         vacs_by_cities = dict(list(data.vacancy_rate_by_city.items())[:10])
 
-        Report(salary_by_year, vacs_by_years, vac_salary_by_years, vac_counts_by_years, salary_by_cities, vacs_by_cities,
-               self.profession_name)
+        with profiler.stage("report"), ProcessPoolExecutor(3) as executor:
+            Report(salary_by_year, vacs_by_years, vac_salary_by_years, vac_counts_by_years, salary_by_cities,
+                   vacs_by_cities, self.profession_name, executor=executor)
 
         print(f"Динамика уровня зарплат по годам: ", salary_by_year)
         print(f"Динамика количества вакансий по годам: ", vacs_by_years)
@@ -280,6 +899,26 @@ class InputConnect:
         print(f"Доля вакансий по городам (в порядке убывания): ", vacs_by_cities)
 
     @staticmethod
+    @profiler.profile("aggregation", lambda statistics, *args: statistics.vacancies_count)
+    def get_statistics(vacancies, profession_name, rates=None, name_index=None):
+        """Собирает всю статистику по вакансиям за один проход
+        Args:
+            vacancies (iterable): Вакансии (список, поток или VacancyColumns)
+            profession_name (str): Название профессии
+            rates (CurrencyRates): Месячные курсы валют, по умолчанию курсы currency_to_rub
+            name_index (NameIndex): Индекс названий для VacancyColumns
+        Returns:
+            VacancyStatistics: Накопленная статистика
+        """
+        if isinstance(vacancies, VacancyColumns):
+            return VacancyStatistics.from_columns(vacancies, profession_name, rates, name_index)
+        statistics = VacancyStatistics(profession_name, rates)
+        for vacancy in vacancies:
+            statistics.add(vacancy)
+        return statistics
+
+    @staticmethod
+    @profiler.profile("get_vacancies_count_by_year", lambda result, data, *args: len(data.vacancies))
     def get_vacancies_count_by_year(data: DataSet, name):
         """Считает количество вакансий по годам
         Args:
@@ -297,6 +936,7 @@ class InputConnect:
         return vacancies_count
 
     @staticmethod
+    @profiler.profile("get_salary_by_name", lambda result, data, *args: len(data.vacancies))
     def get_salary_by_name(data: DataSet, name):
         """Преобразовывает данные о зарплате у каждой вакансии
         Args:
@@ -322,6 +962,7 @@ class InputConnect:
         return salary_by_name
 
     @staticmethod
+    @profiler.profile("get_vacancy_rate_by_city", lambda result, data, *args: len(data.vacancies))
     def get_vacancy_rate_by_city(data: DataSet):
         """Приводит статистику вакансий по городам
         Args:
@@ -347,10 +988,11 @@ class InputConnect:
             vacancy_dict[name] += 1
 
     @staticmethod
-    def convert_currency(vacancy):
+    def convert_currency(vacancy, rates=None):
         """Конвертирует валюту в рубли для параметра "Валюта оклада" у вакансий
         Args:
             vacancy (Vacancy): объект класса Vacancy
+            rates (CurrencyRates): Месячные курсы валют, по умолчанию курсы currency_to_rub
         >>> InputConnect().convert_currency(Vacancy(["name", "40000.0", "80000.0", "RUR", "area", "date"]))
         60000
         >>> InputConnect().convert_currency(Vacancy(["name", "35000.0", "70000.0", "AZN", "area", "date"]))
@@ -358,12 +1000,16 @@ class InputConnect:
         >>> InputConnect().convert_currency(Vacancy(["name", "1000.0", "3000.0", "USD", "area", "date"]))
         121320
         """
-        rate = currency_to_rub[vacancy.salary_currency]
+        if rates is None:
+            rate = currency_to_rub[vacancy.salary_currency]
+        else:
+            rate = rates.get_rate(vacancy.salary_currency, vacancy.published_at)
         return int((vacancy.salary_from * rate + vacancy.salary_to * rate) / 2)
 
     # Vacancy("name", "salary_from", "salary_to", "currency", "area_name", "published_at")
 
     @staticmethod
+    @profiler.profile("get_salary_by_city", lambda result, data, *args: len(data.vacancies))
     def get_salary_by_city(data: DataSet):
         """Приводит статистику вакансий по уровню зарплат в городах
         Args:
@@ -383,8 +1029,492 @@ class InputConnect:
         return dict(sorted(salary_by_city.items(), key=lambda item: item[1], reverse=True))
 
 
+class VacancyStatistics:
+    """Класс, накапливающий статистику по вакансиям за один проход по данным.
+    Хранит только суммы и количества, поэтому занимаемая память зависит от числа различных годов и городов,
+    а не от числа вакансий
+    Attributes:
+        profession_name (str): Название профессии
+        rates (CurrencyRates): Месячные курсы валют, None - используются курсы currency_to_rub
+        vacancies_count (int): Общее количество вакансий
+        salary_by_year (dict): Сумма зарплат всех вакансий по годам
+        vacancies_count_by_year (dict): Количество всех вакансий по годам
+        salary_by_profession_name (dict): Сумма зарплат вакансий выбранной профессии по годам
+        vacancies_count_by_profession_name (dict): Количество вакансий выбранной профессии по годам
+        salary_by_city (dict): Сумма зарплат всех вакансий по городам
+        vacancies_count_by_city (dict): Количество всех вакансий по городам
+    """
+    def __init__(self, profession_name, rates=None):
+        """Инициализирует объект VacancyStatistics
+        Args:
+            profession_name (str): Название профессии
+            rates (CurrencyRates): Месячные курсы валют, по умолчанию курсы currency_to_rub
+        >>> VacancyStatistics("Программист").vacancies_count
+        0
+        """
+        self.profession_name = profession_name
+        self.rates = rates
+        self.vacancies_count = 0
+        self.salary_by_year = {}
+        self.vacancies_count_by_year = {}
+        self.salary_by_profession_name = {}
+        self.vacancies_count_by_profession_name = {}
+        self.salary_by_city = {}
+        self.vacancies_count_by_city = {}
+
+    def add(self, vacancy):
+        """Учитывает одну вакансию во всех накопителях
+        Args:
+            vacancy (Vacancy): Вакансия, дата публикации которой задана строкой или годом
+        """
+        year = vacancy.published_at
+        if not isinstance(year, int):
+            year = DataSet.get_year_optimized(year)
+        salary = InputConnect.convert_currency(vacancy, self.rates)
+        self.vacancies_count += 1
+        self.salary_by_year[year] = self.salary_by_year.get(year, 0) + salary
+        self.vacancies_count_by_year[year] = self.vacancies_count_by_year.get(year, 0) + 1
+        if vacancy.name.__contains__(self.profession_name):
+            self.salary_by_profession_name[year] = self.salary_by_profession_name.get(year, 0) + salary
+            self.vacancies_count_by_profession_name[year] = self.vacancies_count_by_profession_name.get(year, 0) + 1
+        self.salary_by_city[vacancy.area_name] = self.salary_by_city.get(vacancy.area_name, 0) + salary
+        self.vacancies_count_by_city[vacancy.area_name] = self.vacancies_count_by_city.get(vacancy.area_name, 0) + 1
+
+    @staticmethod
+    def from_columns(columns: VacancyColumns, profession_name, rates=None, name_index=None):
+        """Собирает статистику по колоночному хранилищу векторными операциями numpy
+        Args:
+            columns (VacancyColumns): Колоночное хранилище вакансий
+            profession_name (str): Название профессии
+            rates (CurrencyRates): Месячные курсы валют, по умолчанию курсы currency_to_rub
+            name_index (NameIndex): Индекс названий хранилища. Если задан, вакансии профессии берутся из индекса
+        Returns:
+            VacancyStatistics: Накопленная статистика
+        """
+        statistics = VacancyStatistics(profession_name, rates)
+        statistics.vacancies_count = len(columns)
+        if len(columns) == 0:
+            return statistics
+        salary = VacancyStatistics.get_salaries(columns, rates)
+        year = np.asarray(columns.year)
+        area_name = np.asarray(columns.area_name)
+        if name_index is None:
+            is_profession = np.array([name.__contains__(profession_name) for name in columns.names],
+                                     dtype=bool)[np.asarray(columns.name)]
+        else:
+            is_profession = name_index.get_rows(profession_name)
+
+        for key, salary_sum, count in VacancyStatistics.sum_by_key(year, salary):
+            statistics.salary_by_year[key] = salary_sum
+            statistics.vacancies_count_by_year[key] = count
+        for key, salary_sum, count in VacancyStatistics.sum_by_key(year[is_profession], salary[is_profession]):
+            statistics.salary_by_profession_name[key] = salary_sum
+            statistics.vacancies_count_by_profession_name[key] = count
+        for key, salary_sum, count in VacancyStatistics.sum_by_key(area_name, salary):
+            statistics.salary_by_city[columns.area_names[key]] = salary_sum
+            statistics.vacancies_count_by_city[columns.area_names[key]] = count
+        return statistics
+
+    @staticmethod
+    @profiler.profile("currency_conversion", lambda salaries, columns, *args: len(columns))
+    def get_salaries(columns: VacancyColumns, rates=None):
+        """Вычисляет средние зарплаты вакансий в рублях векторными операциями numpy
+        Args:
+            columns (VacancyColumns): Колоночное хранилище вакансий
+            rates (CurrencyRates): Месячные курсы валют, по умолчанию курсы currency_to_rub
+        Returns:
+            numpy.ndarray: Зарплаты, округленные вниз, как в InputConnect.convert_currency
+        """
+        currency_codes = np.asarray(columns.salary_currency)
+        if rates is None:
+            rates = np.array([currency_to_rub[currency] for currency in columns.currencies])[currency_codes]
+        else:
+            codes = np.array([rates.codes[currency] for currency in columns.currencies])[currency_codes]
+            rates = rates.get_rates(codes, np.asarray(columns.month))
+        return ((np.asarray(columns.salary_from) * rates + np.asarray(columns.salary_to) * rates) / 2).astype(np.int64)
+
+    @staticmethod
+    def sum_by_key(keys, values, counts=None):
+        """Группирует значения по ключам, сохраняя порядок первого появления ключей
+        Args:
+            keys (numpy.ndarray): Ключи
+            values (numpy.ndarray): Целочисленные значения
+            counts (numpy.ndarray): Количества вакансий, которым соответствует каждое значение, по умолчанию по одной
+        Returns:
+            list: Кортежи (ключ, сумма значений, количество значений)
+        >>> VacancyStatistics.sum_by_key(np.array([2022, 2021, 2022]), np.array([1, 2, 3]))
+        [(2022, 4, 2), (2021, 2, 1)]
+        >>> VacancyStatistics.sum_by_key(np.array([2022, 2021, 2022]), np.array([1, 2, 3]), np.array([5, 1, 2]))
+        [(2022, 4, 7), (2021, 2, 1)]
+        """
+        if len(keys) == 0:
+            return []
+        unique_keys, first_index, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        order = np.argsort(inverse, kind="stable")
+        starts = np.concatenate(([0], np.cumsum(np.bincount(inverse))[:-1]))
+        sums = np.add.reduceat(values[order], starts)
+        counts = np.bincount(inverse) if counts is None else np.add.reduceat(counts[order], starts)
+        return [(unique_keys[i].item(), int(sums[i]), int(counts[i])) for i in np.argsort(first_index)]
+
+    def merge(self, other):
+        """Добавляет к статистике частичную статистику, собранную по другой части данных
+        Args:
+            other (VacancyStatistics): Частичная статистика по той же профессии
+        Returns:
+            VacancyStatistics: Объединенная статистика (self)
+        """
+        self.vacancies_count += other.vacancies_count
+        for accumulator, other_accumulator in ((self.salary_by_year, other.salary_by_year),
+                                               (self.vacancies_count_by_year, other.vacancies_count_by_year),
+                                               (self.salary_by_profession_name, other.salary_by_profession_name),
+                                               (self.vacancies_count_by_profession_name,
+                                                other.vacancies_count_by_profession_name),
+                                               (self.salary_by_city, other.salary_by_city),
+                                               (self.vacancies_count_by_city, other.vacancies_count_by_city)):
+            for key, value in other_accumulator.items():
+                accumulator[key] = accumulator.get(key, 0) + value
+        return self
+
+    def get_vacancies_count_by_year(self, name):
+        """Возвращает количество вакансий по годам
+        Args:
+            name (str): Название профессии или "None" для всех вакансий
+        Returns:
+            dict: Словарь с количеством вакансий по годам
+        """
+        vacancies_count = self.vacancies_count_by_year if name == "None" else self.vacancies_count_by_profession_name
+        if len(vacancies_count) == 0:
+            return {2022: 0}
+        return dict(vacancies_count)
+
+    def get_salary_by_name(self, name):
+        """Возвращает средний уровень зарплат по годам
+        Args:
+            name (str): Название профессии или "None" для всех вакансий
+        Returns:
+            dict: Словарь со средней зарплатой по годам
+        """
+        if name == "None":
+            salary_by_name, vacancies_count = self.salary_by_year, self.vacancies_count_by_year
+        else:
+            salary_by_name, vacancies_count = self.salary_by_profession_name, self.vacancies_count_by_profession_name
+        if len(salary_by_name) == 0:
+            return {2022: 0}
+        return {key: math.floor(value / vacancies_count[key]) for key, value in salary_by_name.items()}
+
+    def get_vacancy_rate_by_city(self):
+        """Возвращает долю вакансий по городам, в которых не меньше 1% всех вакансий
+        Returns:
+            dict: Отсортированный по убыванию доли словарь, города с равной долей - по названию
+        """
+        vacancy_rate = {key: round(value / self.vacancies_count, 4)
+                        for key, value in self.vacancies_count_by_city.items()}
+        vacancy_rate = {key: value for key, value in vacancy_rate.items() if math.floor(value * 100 >= 1)}
+        return dict(sorted(vacancy_rate.items(), key=VacancyStatistics.get_city_order))
+
+    def get_salary_by_city(self):
+        """Возвращает средний уровень зарплат по городам, в которых не меньше 1% всех вакансий
+        Returns:
+            dict: Отсортированный по убыванию уровня зарплат словарь, города с равной зарплатой - по названию
+        """
+        salary_by_city = {key: math.floor(value / self.vacancies_count_by_city[key])
+                          for key, value in self.salary_by_city.items()
+                          if math.floor(self.vacancies_count_by_city[key] / self.vacancies_count * 100) >= 1}
+        return dict(sorted(salary_by_city.items(), key=VacancyStatistics.get_city_order))
+
+    @staticmethod
+    def get_city_order(item):
+        """Ключ сортировки городов: по убыванию значения, при равенстве - по названию. Порядок не зависит от того,
+        в каком порядке объединялись частичные результаты (по годам или диапазонам файла)
+        Args:
+            item (tuple): Город и значение
+        Returns:
+            tuple: Ключ сортировки
+        >>> sorted([("Москва", 2), ("Казань", 2), ("Омск", 3)], key=VacancyStatistics.get_city_order)
+        [('Омск', 3), ('Казань', 2), ('Москва', 2)]
+        """
+        return -item[1], item[0]
+
+
+class VacancyCube:
+    """Куб сумм зарплат и количеств вакансий по (год, город, название вакансии), сохраняемый на диск.
+    Название вакансии хранится целиком, поэтому поиск профессии по подстроке дает тот же результат, что и по
+    исходным вакансиям, а статистика по любой профессии считается по ячейкам куба без чтения csv-файла
+    Attributes:
+        year (numpy.ndarray): Годы ячеек
+        area_name (numpy.ndarray): Коды городов ячеек в списке area_names
+        name (numpy.ndarray): Коды названий вакансий ячеек в списке names
+        salary_sum (numpy.ndarray): Суммы зарплат в рублях
+        count (numpy.ndarray): Количества вакансий
+        area_names (list): Различные города
+        names (list): Различные названия вакансий
+        sources (dict): Размер и время изменения файлов вакансий и курсов валют, по которым построен куб
+    """
+    def __init__(self, year, area_name, name, salary_sum, count, area_names, names, sources=None):
+        """Инициализирует объект VacancyCube. Ячейки идут в порядке первого появления в исходных вакансиях
+        Args:
+            year (numpy.ndarray): Годы ячеек
+            area_name (numpy.ndarray): Коды городов ячеек
+            name (numpy.ndarray): Коды названий вакансий ячеек
+            salary_sum (numpy.ndarray): Суммы зарплат в рублях
+            count (numpy.ndarray): Количества вакансий
+            area_names (list): Различные города
+            names (list): Различные названия вакансий
+            sources (dict): Размер и время изменения исходных файлов
+        """
+        self.year = year
+        self.area_name = area_name
+        self.name = name
+        self.salary_sum = salary_sum
+        self.count = count
+        self.area_names = area_names
+        self.names = names
+        self.sources = sources or {}
+
+    @staticmethod
+    def from_columns(columns: VacancyColumns, rates=None, sources=None):
+        """Строит куб по колоночному хранилищу вакансий
+        Args:
+            columns (VacancyColumns): Колоночное хранилище вакансий
+            rates (CurrencyRates): Месячные курсы валют, по умолчанию курсы currency_to_rub
+            sources (dict): Размер и время изменения исходных файлов
+        Returns:
+            VacancyCube: Куб
+        """
+        if len(columns) == 0:
+            empty = np.array([], dtype=np.int64)
+            return VacancyCube(empty, empty, empty, empty, empty, [], [], sources)
+        area_count, name_count = len(columns.area_names), len(columns.names)
+        keys = (np.asarray(columns.year, dtype=np.int64) * area_count
+                + np.asarray(columns.area_name)) * name_count + np.asarray(columns.name)
+        cells = np.array(VacancyStatistics.sum_by_key(keys, VacancyStatistics.get_salaries(columns, rates)),
+                         dtype=np.int64)
+        keys = cells[:, 0]
+        return VacancyCube(keys // name_count // area_count, keys // name_count % area_count, keys % name_count,
+                           cells[:, 1], cells[:, 2], list(columns.area_names), list(columns.names), sources)
+
+    @staticmethod
+    def get_sources(file_name, rates=None):
+        """Возвращает размер и время изменения файлов, от которых зависит куб
+        Args:
+            file_name (str): Имя csv-файла с вакансиями
+            rates (CurrencyRates): Месячные курсы валют
+        Returns:
+            dict: Сведения о файле вакансий и файле курсов (None для курсов currency_to_rub)
+        """
+        import columnar_cache
+        return {"vacancies": columnar_cache.get_source_state(file_name),
+                "rates": None if rates is None else columnar_cache.get_source_state(rates.file_name)}
+
+    @staticmethod
+    @profiler.profile("reading")
+    def get_cube(file_name, rates=None, cube_name="vacancies_cube.npz"):
+        """Загружает куб с диска или, если он построен по другой версии файлов, строит и сохраняет заново
+        Args:
+            file_name (str): Имя csv-файла с вакансиями
+            rates (CurrencyRates): Месячные курсы валют, по умолчанию курсы currency_to_rub
+            cube_name (str): Имя файла куба
+        Returns:
+            VacancyCube: Куб
+        """
+        sources = VacancyCube.get_sources(file_name, rates)
+        if os.path.exists(cube_name):
+            cube = VacancyCube.load(cube_name)
+            if cube.sources == sources:
+                return cube
+        cube = VacancyCube.from_columns(DataSet.get_columns(file_name), rates, sources)
+        cube.save(cube_name)
+        return cube
+
+    def save(self, cube_name):
+        """Сохраняет куб в npz-файл. Списки строк и сведения об исходных файлах хранятся в виде json
+        Args:
+            cube_name (str): Имя файла куба
+        """
+        dictionary = json.dumps({"area_names": self.area_names, "names": self.names, "sources": self.sources},
+                                ensure_ascii=False).encode("utf-8")
+        with open(cube_name + ".tmp", "wb") as cube_file:
+            np.savez(cube_file, year=self.year, area_name=self.area_name, name=self.name,
+                     salary_sum=self.salary_sum, count=self.count,
+                     dictionary=np.frombuffer(dictionary, dtype=np.uint8))
+        os.replace(cube_name + ".tmp", cube_name)
+
+    @staticmethod
+    def load(cube_name):
+        """Загружает куб из npz-файла
+        Args:
+            cube_name (str): Имя файла куба
+        Returns:
+            VacancyCube: Куб
+        """
+        with np.load(cube_name) as cube_file:
+            dictionary = json.loads(cube_file["dictionary"].tobytes().decode("utf-8"))
+            return VacancyCube(cube_file["year"], cube_file["area_name"], cube_file["name"], cube_file["salary_sum"],
+                               cube_file["count"], dictionary["area_names"], dictionary["names"],
+                               dictionary["sources"])
+
+    def get_name_index(self, file_name, index_name="vacancies_cube_index.npz"):
+        """Возвращает индекс названий ячеек куба, построенный один раз и сохраненный на диск
+        Args:
+            file_name (str): Имя csv-файла с вакансиями
+            index_name (str): Имя файла индекса
+        Returns:
+            NameIndex: Индекс
+        """
+        return NameIndex.get_index(file_name, self.names, self.name, index_name)
+
+    @profiler.profile("aggregation")
+    def get_statistics(self, profession_name, name_index=None):
+        """Собирает статистику по профессии из ячеек куба
+        Args:
+            profession_name (str): Название профессии
+            name_index (NameIndex): Индекс названий ячеек куба
+        Returns:
+            VacancyStatistics: Статистика, совпадающая со статистикой по исходным вакансиям
+        """
+        statistics = VacancyStatistics(profession_name)
+        statistics.vacancies_count = int(self.count.sum())
+        if name_index is None:
+            is_profession = np.array([name.__contains__(profession_name) for name in self.names],
+                                     dtype=bool)[self.name]
+        else:
+            is_profession = name_index.get_rows(profession_name)
+        for key, salary_sum, count in VacancyStatistics.sum_by_key(self.year, self.salary_sum, self.count):
+            statistics.salary_by_year[key] = salary_sum
+            statistics.vacancies_count_by_year[key] = count
+        for key, salary_sum, count in VacancyStatistics.sum_by_key(self.year[is_profession],
+                                                                   self.salary_sum[is_profession],
+                                                                   self.count[is_profession]):
+            statistics.salary_by_profession_name[key] = salary_sum
+            statistics.vacancies_count_by_profession_name[key] = count
+        for key, salary_sum, count in VacancyStatistics.sum_by_key(self.area_name, self.salary_sum, self.count):
+            statistics.salary_by_city[self.area_names[key]] = salary_sum
+            statistics.vacancies_count_by_city[self.area_names[key]] = count
+        return statistics
+
+
+class ChartTemplate:
+    """Рисунок с графиками отчета, который перерисовывается для новой статистики без повторного построения.
+    Города, доли вакансий и годы задают разметку рисунка, для статистики другой профессии с той же разметкой
+    меняются только высоты столбцов, подписи легенд и масштаб осей
+    Attributes:
+        layout (tuple): Разметка, для которой построен рисунок
+        fig (matplotlib.figure.Figure): Рисунок
+        axes (tuple): Графики зарплат и количества вакансий по годам
+        bars (tuple): Пары столбцов графиков по годам: все вакансии и вакансии профессии
+        legends (tuple): Легенды графиков по годам
+    """
+    def __init__(self, salary_by_year, vacs_by_years, salary_by_cities, vacs_by_cities):
+        """Строит рисунок для разметки статистики, высоты столбцов по годам задаются методом update
+        Args:
+            salary_by_year (dict): Уровень зарплат всех вакансий по годам
+            vacs_by_years (dict):  Количество всех вакансий по годам
+            salary_by_cities (dict): Список городов с самыми высокими зарплатами конкретной профессии
+            vacs_by_cities (dict): Список с отношениями количества вакансий по конкретной профессии к общему количеству вакансий по городам
+        """
+        plt = ChartTemplate.get_pyplot()
+        self.layout = ChartTemplate.get_layout(salary_by_year, vacs_by_years, salary_by_cities, vacs_by_cities)
+        width_coef = 0.4
+        # доли округлены до сотых процента, поэтому при десяти и менее городах их сумма может немного превышать 1
+        other_vacs = max(1 - sum([value for value in vacs_by_cities.values()]), 0)
+        self.fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2)
+        self.axes = (ax1, ax2)
+        bars, legends = [], []
+        for ax, title, fontdict, years in ((ax1, "Уровень зарплат по годам", None, salary_by_year),
+                                           (ax2, "Количество вакансий по годам", {'fontsize': 11}, vacs_by_years)):
+            ax.set_title(title, fontdict=fontdict)
+            bar1 = ax.bar(np.array(list(years.keys())) - 0.4, [0] * len(years), width=width_coef)
+            bar2 = ax.bar(np.array(list(years.keys())), [0] * len(years), width=width_coef)
+            ax.grid(axis="y")
+            ax.set_xticks(np.array(list(years.keys())) - 0.2, list(years.keys()), rotation=90)
+            ax.xaxis.set_tick_params(labelsize=8)
+            ax.yaxis.set_tick_params(labelsize=8)
+            bars.append((bar1, bar2))
+            legends.append(ax.legend((bar1[0], bar2[0]), ("", ""), prop={"size": 8}) if years else None)
+        self.bars, self.legends = tuple(bars), tuple(legends)
+
+        ax3.set_title("Уровень зарплат по городам")
+        ax3.barh(list([str(a).replace(" ", "\n").replace("-", "-\n") for a in reversed(list(salary_by_cities.keys()))]),
+                 list(reversed(list(salary_by_cities.values()))), color="blue", height=0.5, align="center")
+        ax3.yaxis.set_tick_params(labelsize=6)
+        ax3.xaxis.set_tick_params(labelsize=8)
+        ax3.grid(axis="x")
+
+        ax4.set_title("Доля вакансий по городам")
+        ax4.pie(list(vacs_by_cities.values()) + [other_vacs], labels=list(vacs_by_cities.keys()) + ["Другие"], textprops={"fontsize": 6})
+
+    @staticmethod
+    def get_pyplot():
+        """Импортирует pyplot с backend Agg, который рисует в файлы без графического интерфейса
+        Returns:
+            module: matplotlib.pyplot
+        """
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+        return plt
+
+    @staticmethod
+    def get_layout(salary_by_year, vacs_by_years, salary_by_cities, vacs_by_cities):
+        """Возвращает разметку рисунка: годы графиков и статистику по городам, которая не зависит от профессии
+        Args:
+            salary_by_year (dict): Уровень зарплат всех вакансий по годам
+            vacs_by_years (dict):  Количество всех вакансий по годам
+            salary_by_cities (dict): Список городов с самыми высокими зарплатами конкретной профессии
+            vacs_by_cities (dict): Список с отношениями количества вакансий по конкретной профессии к общему количеству вакансий по городам
+        Returns:
+            tuple: Разметка рисунка
+        >>> ChartTemplate.get_layout({2022: 204316}, {2022: 428}, {'Москва': 142291}, {'Москва': 0.1893})
+        ((2022,), (2022,), (('Москва', 142291),), (('Москва', 0.1893),))
+        """
+        return (tuple(salary_by_year), tuple(vacs_by_years), tuple(salary_by_cities.items()),
+                tuple(vacs_by_cities.items()))
+
+    def update(self, salary_by_year, vacs_by_years, vac_salary_by_years, vac_counts_by_years, profession):
+        """Задает высоты столбцов и подписи легенд графиков по годам и пересчитывает масштаб осей
+        Args:
+            salary_by_year (dict): Уровень зарплат всех вакансий по годам
+            vacs_by_years (dict):  Количество всех вакансий по годам
+            vac_salary_by_years (dict): Уровень зарплат конкретной профессии по годам
+            vac_counts_by_years (dict): Количество вакансий конкретной профессии по годам
+            profession (str): Название профессии
+        """
+        labels = (("средняя з/п", "з/п " + profession.lower()),
+                  ("Количество вакансий", "Количество вакансий\n" + profession.lower()))
+        values = ((salary_by_year, vac_salary_by_years), (vacs_by_years, vac_counts_by_years))
+        for ax, bars, legend, heights, texts in zip(self.axes, self.bars, self.legends, values, labels):
+            for bar, bar_heights in zip(bars, heights):
+                for rectangle, height in zip(bar, bar_heights.values()):
+                    rectangle.set_height(height)
+            if legend is not None:
+                for text, label in zip(legend.get_texts(), texts):
+                    text.set_text(label)
+            ax.relim()
+            ax.autoscale_view()
+
+    def save(self, file_name):
+        """Сохраняет рисунок в png-файл. Файл сначала записывается под временным именем,
+        чтобы другие процессы не прочитали его недописанным
+        Args:
+            file_name (str): Имя png-файла
+        """
+        # tight_layout отсчитывает отступы от текущего положения графиков, поэтому сначала оно сбрасывается
+        self.fig.subplots_adjust(**{name: ChartTemplate.get_pyplot().rcParams[f"figure.subplot.{name}"]
+                                    for name in ("left", "right", "bottom", "top", "wspace", "hspace")})
+        self.fig.tight_layout()
+        temporary_name = f"{file_name}.{os.getpid()}.tmp"
+        self.fig.savefig(temporary_name, format="png")
+        os.replace(temporary_name, file_name)
+
+    def close(self):
+        """Закрывает рисунок и освобождает его память"""
+        ChartTemplate.get_pyplot().close(self.fig)
+
+
 class Report:
-    """Класс, отвечающий за визуализацию статистики вакансий
+    """Класс, отвечающий за визуализацию статистики вакансий.
+    Таблица Excel, графики и pdf-файл формируются независимыми этапами в пуле процессов: таблица строится
+    одновременно с графиками и pdf-файлом, pdf-файл - после графиков, изображение которых он содержит
     Attributes:
         salary_by_year (dict): Уровень зарплат всех вакансий по годам
         vacs_by_years (dict):  Количество всех вакансий по годам
@@ -393,8 +1523,15 @@ class Report:
         salary_by_cities (dict): Список городов с самыми высокими зарплатами конкретной профессии
         vacs_by_cities (dict): Список с отношениями количества вакансий по конкретной профессии к общему количеству вакансий по городам
         profession (str): Название профессии
+        directory (str): Папка, в которую сохраняются файлы отчета
+        chart_version (int): Версия оформления графиков, входит в ключ кэша изображений
+        chart_template (ChartTemplate): Рисунок с графиками, переиспользуемый процессом
     """
-    def __init__(self, salary_by_year, vacs_by_years, vac_salary_by_years, vac_counts_by_years, salary_by_cities, vacs_by_cities, profession_name):
+    chart_version = 1
+    chart_template = None
+
+    def __init__(self, salary_by_year, vacs_by_years, vac_salary_by_years, vac_counts_by_years, salary_by_cities, vacs_by_cities, profession_name,
+                 directory=".", executor=None):
         """Инициализирует объект Report
         Args:
             salary_by_year (dict): Уровень зарплат всех вакансий по годам
@@ -404,6 +1541,9 @@ class Report:
             salary_by_cities (dict): Список городов с самыми высокими зарплатами конкретной профессии
             vacs_by_cities (dict): Список с отношениями количества вакансий по конкретной профессии к общему количеству вакансий по городам
             profession_name (str): Название профессии
+            directory (str): Папка, в которую сохраняются report.xlsx, graph.png и report.pdf
+            executor (concurrent.futures.Executor): Пул процессов вызывающего кода для этапов формирования отчета.
+                Если не задан, этапы выполняются по очереди в текущем процессе
         >>> type(Report({2022: 204316}, {2022: 428}, {2022: 103546}, {2022: 21}, {'Казань': 156337, 'Москва': 142291}, {'Москва': 0.1893}, "Программист")).__name__
         'Report'
         >>> Report({2022: 204316}, {2022: 428}, {2022: 103546}, {2022: 21}, {'Казань': 156337, 'Москва': 142291}, {'Москва': 0.1893}, "Программист").salary_by_year
@@ -429,13 +1569,29 @@ class Report:
         self.vacs_by_cities = vacs_by_cities
 
         self.profession = profession_name
+        self.directory = directory
 
-        Report.generate_excel(self.salary_by_year, self.vacs_by_years, self.vac_salary_by_years, self.vac_counts_by_years,
-                              self.salary_by_cities, self.vacs_by_cities, self.profession)
+        statistics = (salary_by_year, vacs_by_years, vac_salary_by_years, vac_counts_by_years, salary_by_cities,
+                      dict(vacs_by_cities), profession_name, directory)
+        if executor is None:
+            # запуск пула процессов на каждый отчет дороже самих этапов небольшого отчета
+            Report.generate_excel(*statistics)
+            Report.generate_image(*statistics)
+            Report.generate_pdf(*statistics)
+        else:
+            excel = profiler.submit(executor, Report.generate_excel, *statistics)
+            image = profiler.submit(executor, Report.generate_image, *statistics)
+            profiler.get_result(image)
+            pdf = profiler.submit(executor, Report.generate_pdf, *statistics)
+            profiler.get_result(excel)
+            profiler.get_result(pdf)
+        # доли вакансий в виде строк, как их выводит pdf-файл
+        self.vacs_by_cities.update(Report.format_vacancy_rates(vacs_by_cities))
 
     @staticmethod
+    @profiler.profile("generate_excel")
     def generate_excel(salary_by_year, vacs_by_years, vac_salary_by_years, vac_counts_by_years, salary_by_cities,
-                       vacs_by_cities, profession):
+                       vacs_by_cities, profession, directory="."):
         """Формирует таблицу Excel с данными о вакансиях по выбраннной профессии
         Args:
             salary_by_year (dict): Уровень зарплат всех вакансий по годам
@@ -445,65 +1601,96 @@ class Report:
             salary_by_cities (dict): Список городов с самыми высокими зарплатами конкретной профессии
             vacs_by_cities (dict): Список с отношениями количества вакансий по конкретной профессии к общему количеству вакансий по городам
             profession (str): Название профессии
+            directory (str): Папка отчета
         """
-        wb = Workbook()
-        sheet1 = wb.active
-        thin = Side(border_style="thin", color="000000")
-        sheet1.title = "Статистика по годам"
-        sheet2 = wb.create_sheet("Статистика по городам")
+        from openpyxl import Workbook
+        wb = Workbook(write_only=True)
+        Report.add_named_styles(wb)
         heads1 = ["Год", "Средняя зарплата", f"Средняя зарплата - {profession}",
                   "Количество вакансий", f"Количество вакансий - {profession}"]
         heads2 = ["Город", "Уровень зарплат", "", "Город", "Доля вакансий"]
+        rows1 = [(year, value, vac_salary_by_years[year], vacs_by_years[year], vac_counts_by_years[year])
+                 for year, value in salary_by_year.items()]
+        rows2 = [(city, value, "", rate_city, None if rate is None else str(rate * 100) + "%")
+                 for (city, value), (rate_city, rate) in itertools.zip_longest(
+                     salary_by_cities.items(), vacs_by_cities.items(), fillvalue=(None, None))]
+        Report.write_sheet(wb, "Статистика по годам", heads1, rows1)
+        Report.write_sheet(wb, "Статистика по городам", heads2, rows2)
+
+        wb.save(os.path.join(directory, "report.xlsx"))
+
+    @staticmethod
+    def add_named_styles(wb):
+        """Добавляет в книгу именованные стили заголовка и ячейки таблицы, общие для всех ячеек листов
+        Args:
+            wb (openpyxl.Workbook): Книга Excel
+        """
+        from openpyxl.styles import Border, Font, NamedStyle, Side
+        thin = Side(border_style="thin", color="000000")
+        border = Border(left=thin, top=thin, right=thin, bottom=thin)
+        wb.add_named_style(NamedStyle("report_head", font=Font(bold=True), border=border))
+        wb.add_named_style(NamedStyle("report_cell", border=border))
+
+    @staticmethod
+    def get_column_widths(heads, rows):
+        """Вычисляет ширину столбцов по длине самого длинного значения
+        Args:
+            heads (list): Заголовки столбцов
+            rows (list): Строки таблицы
+        Returns:
+            list: Ширина каждого столбца
+        >>> Report.get_column_widths(["Год", "Средняя зарплата"], [(2022, 204316), (2023, None)])
+        [6, 18]
+        """
+        widths = [len(str(head)) for head in heads]
+        for row in rows:
+            for i, value in enumerate(row):
+                if value is not None:
+                    widths[i] = max(widths[i], len(str(value)))
+        return [width + 2 for width in widths]
+
+    @staticmethod
+    def write_sheet(wb, title, heads, rows):
+        """Записывает лист в книгу, открытую в режиме write_only: строки сразу сериализуются в файл и не хранятся
+        в памяти в виде ячеек, поэтому ширина столбцов вычисляется по значениям до записи строк
+        Args:
+            wb (openpyxl.Workbook): Книга Excel в режиме write_only со стилями add_named_styles
+            title (str): Название листа
+            heads (list): Заголовки столбцов
+            rows (list): Строки таблицы
+        """
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.utils.cell import get_column_letter
+        sheet = wb.create_sheet(title)
+        for i, width in enumerate(Report.get_column_widths(heads, rows)):
+            sheet.column_dimensions[get_column_letter(i + 1)].width = width
 
-        for i, head in enumerate(heads1):
-            sheet1.cell(row=1, column=(i + 1), value=head).font = Font(bold=True)
-        for i, head in enumerate(heads2):
-            sheet2.cell(row=1, column=(i + 1), value=head).font = Font(bold=True)
-
-        for year, value in salary_by_year.items():
-            sheet1.append((year, value, vac_salary_by_years[year], vacs_by_years[year], vac_counts_by_years[year]))
-        for city, value in salary_by_cities.items():
-            sheet2.append({"A": city, "B": value, "C": ""})
-        for city, value in vacs_by_cities.items():
-            sheet2.append({"D": city, "E": str(value*100)+"%"})
-
-        sheet2.move_range(cell_range="D12:E21", rows=-10)
-
-        for column in sheet1.columns:
-            for cell in column:
-                cell.border = Border(left=thin, top=thin, right=thin, bottom=thin)
-        for column in sheet2.columns:
-            for cell in column:
-                cell.border = Border(left=thin, top=thin, right=thin, bottom=thin)
-
-        def as_text(value):
-            """Вспомогательный метод, отвечающий за правильную визуализацию ячеек таблицы и конвертацию их в строку
+        def get_cells(values, style):
+            """Вспомогательный метод, создающий ячейки строки с именованным стилем
             Args:
-                value (int or float to str): Значение ячейки таблицы
+                values (iterable): Значения ячеек
+                style (str): Название стиля
             Returns:
-                str: Стрковое значение ячейки таблицы
+                list: Ячейки строки
             """
-            if value is None:
-                return ""
-            return str(value)
-
-        for column_cells in sheet1.columns:
-            length = max(len(as_text(cell.value)) for cell in column_cells)
-            sheet1.column_dimensions[openpyxl.utils.cell.get_column_letter(column_cells[0].column)].width = length + 2
-        for column_cells in sheet2.columns:
-            length = max(len(as_text(cell.value)) for cell in column_cells)
-            sheet2.column_dimensions[openpyxl.utils.cell.get_column_letter(column_cells[0].column)].width = length + 2
+            cells = []
+            for value in values:
+                cell = WriteOnlyCell(sheet, value)
+                cell.style = style
+                cells.append(cell)
+            return cells
 
-        Report.generate_image(salary_by_year, vacs_by_years, vac_salary_by_years, vac_counts_by_years, salary_by_cities,
-                       vacs_by_cities, profession)
-        Report.generate_pdf(salary_by_year, vacs_by_years, vac_salary_by_years, vac_counts_by_years, salary_by_cities,
-                            vacs_by_cities, profession)
-        wb.save("report.xlsx")
+        sheet.append(get_cells(heads, "report_head"))
+        for row in rows:
+            sheet.append(get_cells(row, "report_cell"))
 
     @staticmethod
+    @profiler.profile("generate_image")
     def generate_image(salary_by_year, vacs_by_years, vac_salary_by_years, vac_counts_by_years, salary_by_cities,
-                       vacs_by_cities, profession):
-        """Формирует изображение с графиками статистики по вакансиям выбраннной профессии
+                       vacs_by_cities, profession, directory=".", cache_directory="chart_cache"):
+        """Формирует изображение с графиками статистики по вакансиям выбраннной профессии.
+        Изображение берется из кэша по хэшу статистики, а при отсутствии рисуется на рисунке ChartTemplate,
+        который процесс переиспользует для следующих профессий с той же разметкой
         Args:
             salary_by_year (dict): Уровень зарплат всех вакансий по годам
             vacs_by_years (dict):  Количество всех вакансий по годам
@@ -512,46 +1699,61 @@ class Report:
             salary_by_cities (dict): Список городов с самыми высокими зарплатами конкретной профессии
             vacs_by_cities (dict): Список с отношениями количества вакансий по конкретной профессии к общему количеству вакансий по городам
             profession (str): Название профессии
+            directory (str): Папка отчета
+            cache_directory (str): Папка кэша изображений
         """
-        width_coef = 0.4
-        other_vacs = 1 - sum([value for value in vacs_by_cities.values()])
-        fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2)
-
-        ax1.set_title("Уровень зарплат по годам")
-        bar1 = ax1.bar(np.array(list(salary_by_year.keys())) - 0.4, salary_by_year.values(), width=width_coef)
-        bar2 = ax1.bar(np.array(list(salary_by_year.keys())), vac_salary_by_years.values(), width=width_coef)
-        ax1.grid(axis="y")
-        ax1.set_xticks(np.array(list(salary_by_year.keys())) - 0.2, list(salary_by_year.keys()), rotation=90)
-        ax1.xaxis.set_tick_params(labelsize=8)
-        ax1.yaxis.set_tick_params(labelsize=8)
-        ax1.legend((bar1[0], bar2[0]), ("средняя з/п", "з/п " + profession.lower()), prop={"size": 8})
-
-        ax2.set_title("Количество вакансий по годам", fontdict={'fontsize': 11})
-        bar1 = ax2.bar(np.array(list(vacs_by_years.keys())) - 0.4, vacs_by_years.values(), width=width_coef)
-        bar2 = ax2.bar(np.array(list(vacs_by_years.keys())), vac_counts_by_years.values(), width=width_coef)
-        ax2.set_xticks(np.array(list(vacs_by_years.keys())) - 0.2, list(vacs_by_years.keys()), rotation=90)
-        ax2.grid(axis="y")
-        ax2.xaxis.set_tick_params(labelsize=8)
-        ax2.yaxis.set_tick_params(labelsize=8)
-        ax2.legend((bar1[0], bar2[0]), ("Количество вакансий", "Количество вакансий\n" + profession.lower()),
-                   prop={"size": 8})
-
-        ax3.set_title("Уровень зарплат по городам")
-        ax3.barh(list([str(a).replace(" ", "\n").replace("-", "-\n") for a in reversed(list(salary_by_cities.keys()))]),
-                 list(reversed(list(salary_by_cities.values()))), color="blue", height=0.5, align="center")
-        ax3.yaxis.set_tick_params(labelsize=6)
-        ax3.xaxis.set_tick_params(labelsize=8)
-        ax3.grid(axis="x")
+        cache_name = os.path.join(cache_directory, Report.get_chart_key(
+            salary_by_year, vacs_by_years, vac_salary_by_years, vac_counts_by_years, salary_by_cities, vacs_by_cities,
+            profession) + ".png")
+        if not os.path.exists(cache_name):
+            layout = ChartTemplate.get_layout(salary_by_year, vacs_by_years, salary_by_cities, vacs_by_cities)
+            if Report.chart_template is None or Report.chart_template.layout != layout:
+                if Report.chart_template is not None:
+                    Report.chart_template.close()
+                Report.chart_template = ChartTemplate(salary_by_year, vacs_by_years, salary_by_cities, vacs_by_cities)
+            Report.chart_template.update(salary_by_year, vacs_by_years, vac_salary_by_years, vac_counts_by_years,
+                                         profession)
+            os.makedirs(cache_directory, exist_ok=True)
+            Report.chart_template.save(cache_name)
+        shutil.copyfile(cache_name, os.path.join(directory, "graph.png"))
 
-        ax4.set_title("Доля вакансий по городам")
-        ax4.pie(list(vacs_by_cities.values()) + [other_vacs], labels=list(vacs_by_cities.keys()) + ["Другие"], textprops={"fontsize": 6})
+    @staticmethod
+    def get_chart_key(salary_by_year, vacs_by_years, vac_salary_by_years, vac_counts_by_years, salary_by_cities,
+                      vacs_by_cities, profession):
+        """Вычисляет ключ изображения с графиками в кэше: хэш статистики и названия профессии
+        Args:
+            salary_by_year (dict): Уровень зарплат всех вакансий по годам
+            vacs_by_years (dict):  Количество всех вакансий по годам
+            vac_salary_by_years (dict): Уровень зарплат конкретной профессии по годам
+            vac_counts_by_years (dict): Количество вакансий конкретной профессии по годам
+            salary_by_cities (dict): Список городов с самыми высокими зарплатами конкретной профессии
+            vacs_by_cities (dict): Список с отношениями количества вакансий по конкретной профессии к общему количеству вакансий по городам
+            profession (str): Название профессии
+        Returns:
+            str: Шестнадцатеричный хэш sha256
+        >>> len(Report.get_chart_key({2022: 204316}, {2022: 428}, {2022: 103546}, {2022: 21}, {'Москва': 142291}, {'Москва': 0.1893}, "Программист"))
+        64
+        """
+        statistics = [Report.chart_version, profession] + [list(values.items()) for values in (
+            salary_by_year, vacs_by_years, vac_salary_by_years, vac_counts_by_years, salary_by_cities, vacs_by_cities)]
+        return hashlib.sha256(json.dumps(statistics, ensure_ascii=False).encode("utf-8")).hexdigest()
 
-        plt.tight_layout()
-        plt.savefig("graph.png")
+    @staticmethod
+    def format_vacancy_rates(vacs_by_cities):
+        """Переводит доли вакансий по городам в проценты с запятой
+        Args:
+            vacs_by_cities (dict): Доли вакансий по городам
+        Returns:
+            dict: Строковые значения долей
+        >>> Report.format_vacancy_rates({'Москва': 0.1893})
+        {'Москва': '18,93%'}
+        """
+        return {key: str(round(value * 100, 2)).replace(".", ",") + "%" for key, value in vacs_by_cities.items()}
 
     @staticmethod
+    @profiler.profile("generate_pdf")
     def generate_pdf(salary_by_year, vacs_by_years, vac_salary_by_years, vac_counts_by_years, salary_by_cities,
-                       vacs_by_cities, profession):
+                       vacs_by_cities, profession, directory=".", engine="reportlab"):
         """Формирует pdf-файл со статистикой вакансий по выбраннной профессии
         Args:
             salary_by_year (dict): Уровень зарплат всех вакансий по годам
@@ -561,24 +1763,54 @@ class Report:
             salary_by_cities (dict): Список городов с самыми высокими зарплатами конкретной профессии
             vacs_by_cities (dict): Список с отношениями количества вакансий по конкретной профессии к общему количеству вакансий по городам
             profession (str): Название профессии
+            directory (str): Папка отчета
+            engine (str): "reportlab" - pdf-файл формируется в текущем процессе модулем pdf_backend,
+                "wkhtmltopdf" - шаблон pdf_template.html преобразуется внешней программой wkhtmltopdf
         """
-        env = Environment(loader=FileSystemLoader('.'))
-        template = env.get_template("pdf_template.html")
         statistics = []
         for year in salary_by_year.keys():
-            statistics.append([year, salary_by_year[year], vacs_by_years[year], vac_salary_by_years[year], vac_counts_by_years[year]])
-        for key in vacs_by_cities:
-            vacs_by_cities[key] = str(round(vacs_by_cities[key] * 100, 2)).replace(".", ",")+"%"
+            statistics.append([year, salary_by_year[year], vac_salary_by_years[year], vacs_by_years[year], vac_counts_by_years[year]])
+        vacs_by_cities = Report.format_vacancy_rates(vacs_by_cities)
 
         columns_1 = ["Год", "Средняя зарплата", "Средняя зарплата - "+profession, "Количество вакансий", "Количество вакансий - "+profession]
+        city_tables = [(["Город", "Уровень зарплат"], list(salary_by_cities.items())),
+                       (["Город", "Доля вакансий"], list(vacs_by_cities.items()))]
+        file_name = os.path.join(directory, 'report.pdf')
+        image_file = os.path.abspath(os.path.join(directory, "graph.png"))
+
+        if engine == "reportlab":
+            import pdf_backend
+            pdf_backend.render(file_name, profession, image_file, columns_1, statistics, city_tables)
+            return
 
-        pdf_template = template.render({'name': profession, 'statistics': statistics, "columns_1": columns_1,
-                                        'salary_by_cities': salary_by_cities, 'vacs_by_cities': vacs_by_cities})
+        import pdfkit
+        import report_templates
+        pdf_template = report_templates.render("pdf_template.html", profession, image_file, columns_1, statistics,
+                                               city_tables)
 
-        config = pdfkit.configuration(wkhtmltopdf=r'D:\wkhtmltox\bin\wkhtmltopdf.exe')
-        pdfkit.from_string(pdf_template, 'report.pdf', configuration=config, options={"enable-local-file-access": ""})
+        config = pdfkit.configuration(wkhtmltopdf=shutil.which("wkhtmltopdf") or r'D:\wkhtmltox\bin\wkhtmltopdf.exe')
+        pdfkit.from_string(pdf_template, file_name, configuration=config, options={"enable-local-file-access": ""})
 
 
-input_data = InputConnect()
-data = DataSet.get_dataset(input_data.file_name)
-input_data.print_data_dict(input_data, data)
\ No newline at end of file
+if __name__ == "__main__":
+    import columnar_cache
+    profile_name = profiler.get_profile_name(sys.argv)
+    if profile_name is not None:
+        profiler.enable()
+    input_data = InputConnect()
+    if "--build-cache" in sys.argv:
+        DataSet.convert_to_cache(input_data.file_name)
+    statistics = None
+    if "--cube" in sys.argv:
+        data = DataSet(input_data.file_name)
+        cube = VacancyCube.get_cube(input_data.file_name, input_data.currency_rates)
+        statistics = cube.get_statistics(input_data.profession_name, cube.get_name_index(input_data.file_name))
+    elif columnar_cache.is_fresh(input_data.file_name, "vacancies"):
+        data = DataSet.get_dataset_from_cache(input_data.file_name)
+        statistics = InputConnect.get_statistics(data.vacancies, input_data.profession_name, input_data.currency_rates,
+                                                 data.vacancies.get_name_index(input_data.file_name))
+    else:
+        data = DataSet.get_dataset_stream(input_data.file_name)
+    input_data.print_data_dict(input_data, data, statistics)
+    if profile_name is not None:
+        profiler.dump(profile_name)
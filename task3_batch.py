@@ -0,0 +1,214 @@
+import argparse
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+from task3 import DataSet, InputConnect, Report, VacancyColumns, VacancyStatistics
+
+
+class PatternMatcher:
+    """Автомат Ахо - Корасик: находит все шаблоны, входящие в строку, за один проход по ее символам
+
+    Attributes:
+        patterns (list): Шаблоны (названия профессий или регионов)
+        transitions (list): Переходы бора по символам для каждого состояния
+        failures (list): Состояние для перехода при отсутствии символа в боре
+        outputs (list): Номера шаблонов, которые заканчиваются в состоянии
+    """
+    def __init__(self, patterns):
+        """Строит бор шаблонов и переходы по неудаче
+
+        Args:
+            patterns (list): Шаблоны
+
+        >>> sorted(PatternMatcher(["Программист", "1С", "грам", "Аналитик"]).match("Программист 1С"))
+        [0, 1, 2]
+        """
+        self.patterns = list(patterns)
+        self.transitions = [{}]
+        self.failures = [0]
+        self.outputs = [set()]
+        for number, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                if char not in self.transitions[state]:
+                    self.transitions[state][char] = len(self.transitions)
+                    self.transitions.append({})
+                    self.failures.append(0)
+                    self.outputs.append(set())
+                state = self.transitions[state][char]
+            self.outputs[state].add(number)
+        queue = deque(self.transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.transitions[state].items():
+                queue.append(next_state)
+                failure = self.failures[state]
+                while failure and char not in self.transitions[failure]:
+                    failure = self.failures[failure]
+                self.failures[next_state] = self.transitions[failure].get(char, 0)
+                self.outputs[next_state] |= self.outputs[self.failures[next_state]]
+
+    def match(self, text):
+        """Возвращает номера шаблонов, которые являются подстроками текста
+
+        Args:
+            text (str): Текст (название вакансии или региона)
+
+        Returns:
+            set: Номера найденных шаблонов
+        """
+        found = set(self.outputs[0])
+        state = 0
+        for char in text:
+            while state and char not in self.transitions[state]:
+                state = self.failures[state]
+            state = self.transitions[state].get(char, 0)
+            found |= self.outputs[state]
+        return found
+
+    def get_masks(self, texts):
+        """Для каждого шаблона отмечает тексты, в которые он входит
+
+        Args:
+            texts (list): Тексты (различные названия вакансий или регионов)
+
+        Returns:
+            numpy.ndarray: Матрица (шаблон x текст) из значений bool
+        """
+        masks = np.zeros((len(self.patterns), len(texts)), dtype=bool)
+        for code, text in enumerate(texts):
+            for number in self.match(text):
+                masks[number, code] = True
+        return masks
+
+
+def get_statistics_by_professions(columns: VacancyColumns, profession_names, area_names=None, rates=None,
+                                  name_index=None):
+    """Собирает статистику сразу для нескольких профессий (и регионов) по однажды загруженным вакансиям.
+    Зарплаты, статистика по годам и городам считаются один раз. Вакансии профессии берутся из индекса названий,
+    а без индекса названия вакансий проверяются одним проходом автомата Ахо - Корасик по различным значениям.
+    Регионы проверяются автоматом Ахо - Корасик
+
+    Args:
+        columns (VacancyColumns): Колоночное хранилище вакансий
+        profession_names (list): Названия профессий
+        area_names (list): Названия регионов. Если заданы, статистика профессии считается отдельно
+            для каждого региона по вакансиям, регион которых содержит его название
+        rates (CurrencyRates): Месячные курсы валют, по умолчанию курсы currency_to_rub
+        name_index (NameIndex): Индекс названий хранилища (VacancyColumns.get_name_index)
+
+    Returns:
+        dict: VacancyStatistics для каждой пары (профессия, регион), регион None, если регионы не заданы
+    """
+    total = VacancyStatistics("", rates)
+    total.vacancies_count = len(columns)
+    salary = VacancyStatistics.get_salaries(columns, rates)
+    year = np.asarray(columns.year)
+    area_name = np.asarray(columns.area_name)
+    for key, salary_sum, count in VacancyStatistics.sum_by_key(year, salary):
+        total.salary_by_year[key] = salary_sum
+        total.vacancies_count_by_year[key] = count
+    for key, salary_sum, count in VacancyStatistics.sum_by_key(area_name, salary):
+        total.salary_by_city[columns.area_names[key]] = salary_sum
+        total.vacancies_count_by_city[columns.area_names[key]] = count
+
+    if name_index is None:
+        name_masks = PatternMatcher(profession_names).get_masks(columns.names)
+        profession_rows = [np.flatnonzero(name_mask[np.asarray(columns.name)]) for name_mask in name_masks]
+    else:
+        profession_rows = [name_index.get_rows(profession_name) for profession_name in profession_names]
+    if area_names:
+        area_masks = PatternMatcher(area_names).get_masks(columns.area_names)
+        regions = list(zip(area_names, area_masks[:, area_name]))
+    else:
+        regions = [(None, None)]
+    statistics_by_professions = {}
+    for profession_name, rows_of_profession in zip(profession_names, profession_rows):
+        for region, is_region in regions:
+            rows = rows_of_profession if is_region is None else rows_of_profession[is_region[rows_of_profession]]
+            statistics = VacancyStatistics(profession_name, rates).merge(total)
+            for key, salary_sum, count in VacancyStatistics.sum_by_key(year[rows], salary[rows]):
+                statistics.salary_by_profession_name[key] = salary_sum
+                statistics.vacancies_count_by_profession_name[key] = count
+            statistics_by_professions[profession_name, region] = statistics
+    return statistics_by_professions
+
+
+def get_report_directory(output_directory, profession_name, region=None):
+    """Возвращает папку отчета по профессии, заменяя символы, недопустимые в именах файлов
+
+    Args:
+        output_directory (str): Папка для всех отчетов
+        profession_name (str): Название профессии
+        region (str): Название региона
+
+    Returns:
+        str: Путь к папке отчета
+
+    >>> get_report_directory("reports", "C/C++", "Москва").replace(os.sep, "/")
+    'reports/C_C++ - Москва'
+    """
+    name = profession_name if region is None else f"{profession_name} - {region}"
+    return os.path.join(output_directory, re.sub(r'[<>:"/\\|?*]', "_", name))
+
+
+def generate_report(statistics, profession_name, directory, executor=None):
+    """Формирует отчет по статистике профессии в папке directory
+
+    Args:
+        statistics (VacancyStatistics): Статистика профессии
+        profession_name (str): Название профессии
+        directory (str): Папка отчета
+        executor (concurrent.futures.Executor): Пул процессов для этапов формирования отчета
+
+    Returns:
+        str: Папка отчета
+    """
+    os.makedirs(directory, exist_ok=True)
+    Report(statistics.get_salary_by_name("None"), statistics.get_vacancies_count_by_year("None"),
+           statistics.get_salary_by_name(profession_name),
+           statistics.get_vacancies_count_by_year(profession_name),
+           dict(list(statistics.get_salary_by_city().items())[:10]),
+           dict(list(statistics.get_vacancy_rate_by_city().items())[:10]), profession_name, directory, executor)
+    return directory
+
+
+def generate_reports(statistics_by_professions, output_directory="reports", processes=None):
+    """Формирует отдельный отчет (report.xlsx, graph.png, report.pdf) для каждой профессии и региона.
+    Этапы всех отчетов выполняются в общем пуле процессов, отчеты ожидают свои этапы в отдельных потоках,
+    поэтому таблицы, графики и pdf-файлы разных отчетов формируются одновременно
+
+    Args:
+        statistics_by_professions (dict): VacancyStatistics для каждой пары (профессия, регион)
+        output_directory (str): Папка для всех отчетов
+        processes (int): Количество процессов, по умолчанию os.cpu_count()
+
+    Returns:
+        list: Папки сформированных отчетов
+    """
+    if not statistics_by_professions:
+        return []
+    with ProcessPoolExecutor(processes) as executor, \
+            ThreadPoolExecutor(len(statistics_by_professions)) as threads:
+        futures = [threads.submit(generate_report, statistics, profession_name,
+                                  get_report_directory(output_directory, profession_name, region), executor)
+                   for (profession_name, region), statistics in statistics_by_professions.items()]
+        return [future.result() for future in futures]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("professions", nargs="+")
+    parser.add_argument("--regions", nargs="+")
+    parser.add_argument("--output", default="reports")
+    parser.add_argument("--processes", type=int)
+    args = parser.parse_args()
+    input_data = InputConnect()
+    columns = DataSet.get_columns(input_data.file_name)
+    statistics_by_professions = get_statistics_by_professions(columns, args.professions, args.regions,
+                                                              input_data.currency_rates,
+                                                              columns.get_name_index(input_data.file_name))
+    for directory in generate_reports(statistics_by_professions, args.output, args.processes):
+        print(directory)
@@ -0,0 +1,55 @@
+from unittest import TestCase
+from task3 import NameIndex, Vacancy, VacancyColumns, VacancyStatistics
+from task3_batch import PatternMatcher, get_statistics_by_professions
+
+
+class PatternMatcherTests(TestCase):
+    def test_match(self):
+        patterns = ["Программист", "грамм", "ист", "1С", "Аналитик", "C++", "а"]
+        matcher = PatternMatcher(patterns)
+        for text in ("Программист 1С", "Аналитик данных", "Разработчик C++", "", "Тестировщик"):
+            self.assertEqual(matcher.match(text), {number for number, pattern in enumerate(patterns) if pattern in text})
+
+    def test_get_masks(self):
+        masks = PatternMatcher(["Моск", "Казань"]).get_masks(["Москва", "Казань", "Московская область"])
+        self.assertEqual(masks.tolist(), [[True, False, True], [False, True, False]])
+
+
+class StatisticsByProfessionsTests(TestCase):
+    def setUp(self):
+        self.columns = VacancyColumns()
+        for vacancy in [Vacancy(['Программист', 1000, 3000, 'RUR', 'Москва', '2021-05-31T17:32:31+0300']),
+                        Vacancy(['Аналитик', 1000, 3000, 'EUR', 'Казань', '2021-06-30T17:32:31+0300']),
+                        Vacancy(['Программист 1С', 4000, 6000, 'RUR', 'Казань', '2022-06-30T17:32:31+0300']),
+                        Vacancy(['Программист', 3000, 5000, 'RUR', 'Москва', '2021-07-31T17:32:31+0300'])]:
+            self.columns.append(vacancy)
+
+    def test_professions(self):
+        statistics_by_professions = get_statistics_by_professions(self.columns, ['Программист', 'Аналитик', '1С'])
+        self.assertEqual(list(statistics_by_professions), [('Программист', None), ('Аналитик', None), ('1С', None)])
+        for (profession_name, region), statistics in statistics_by_professions.items():
+            expected = VacancyStatistics.from_columns(self.columns, profession_name)
+            for name in ('None', profession_name):
+                self.assertEqual(statistics.get_salary_by_name(name), expected.get_salary_by_name(name))
+                self.assertEqual(statistics.get_vacancies_count_by_year(name),
+                                 expected.get_vacancies_count_by_year(name))
+            self.assertEqual(statistics.get_salary_by_city(), expected.get_salary_by_city())
+
+    def test_regions(self):
+        statistics_by_professions = get_statistics_by_professions(self.columns, ['Программист'], ['Москва', 'Казань'])
+        self.assertEqual(statistics_by_professions['Программист', 'Москва'].get_salary_by_name('Программист'),
+                         {2021: 3000})
+        self.assertEqual(statistics_by_professions['Программист', 'Казань'].get_vacancies_count_by_year('Программист'),
+                         {2022: 1})
+        self.assertEqual(statistics_by_professions['Программист', 'Казань'].get_vacancies_count_by_year('None'),
+                         {2021: 3, 2022: 1})
+
+    def test_name_index(self):
+        name_index = NameIndex.build(self.columns.names, self.columns.name)
+        professions, regions = ['Программист', 'Аналитик', '1С', 'Тестировщик'], ['Москва', 'Казань']
+        expected = get_statistics_by_professions(self.columns, professions, regions)
+        statistics_by_professions = get_statistics_by_professions(self.columns, professions, regions,
+                                                                  name_index=name_index)
+        self.assertEqual(list(statistics_by_professions), list(expected))
+        for key, statistics in statistics_by_professions.items():
+            self.assertEqual(vars(statistics), vars(expected[key]))
@@ -1,5 +1,10 @@
-from unittest import TestCase
-from task3 import Vacancy, DataSet, InputConnect, Report
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import TestCase, skipUnless
+from task3 import Vacancy, DataSet, InputConnect, Report, VacancyStatistics, VacancyColumns, CellCleaner, \
+    CurrencyRates, VacancyCube, NameIndex
 
 class VacancyTests(TestCase):
     def test_vacancy_type(self):
@@ -28,6 +33,18 @@ class VacancyTests(TestCase):
             '2022-05-31T17:32:31+0300')
 
 
+class CellCleanerTests(TestCase):
+    def test_clean_row(self):
+        cleaner = CellCleaner()
+        self.assertEqual(cleaner.clean_row(['name', 'salary_from', 'published_at'],
+                                           ['<p>Программист</p>\n 1С', ' 1000 ', '2022-05-31T17:32:31+0300']),
+                         {'name': 'Программист; 1С', 'salary_from': '1000', 'published_at': '2022-05-31T17:32:31+0300'})
+        self.assertEqual(cleaner.rewritten_count, 2)
+
+    def test_spaces_rule_keeps_tags(self):
+        self.assertEqual(CellCleaner({'name': 'spaces'}).clean('name', '<b>Программист</b>'), '<b>Программист</b>')
+
+
 class InputConnectTests(TestCase):
     def test_inputconnect_type(self):
         self.assertEqual(type(InputConnect()).__name__, 'InputConnect')
@@ -55,6 +72,108 @@ class DataSetTests(TestCase):
     def test_empty_csv_filer(self):
         self.assertEqual(DataSet("file_name").csv_filer([], [[]]), [{}])
 
+    def test_get_chunks(self):
+        rows = ['name,salary_from,salary_to,salary_currency,area_name,published_at\n']
+        for i in range(50):
+            rows.append(f'"Программист\n{i}",1000,2000,RUR,Москва,2022-05-31T17:32:31+0300\n')
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "vacancies.csv")
+            with open(file_name, "w", encoding="utf_8", newline="") as file:
+                file.writelines(rows)
+            chunks = DataSet.get_chunks(file_name, 7)
+            vacancies = [vacancy for start, end in chunks for vacancy in DataSet.iter_vacancies(file_name, start, end)]
+        self.assertEqual(len(chunks), 7)
+        self.assertEqual([vacancy.name for vacancy in vacancies], [f"Программист; {i}" for i in range(50)])
+
+    def test_get_files_by_years_incremental(self):
+        header = 'name,salary_from,salary_to,salary_currency,area_name,published_at\n'
+        rows = ['Программист,1000,2000,RUR,Москва,2021-05-31T17:32:31+0300\n',
+                '"Аналитик\nданных",1000,2000,RUR,Казань,2022-05-31T17:32:31+0300\n',
+                'Тестировщик,1000,2000,RUR,Москва,2022-06-01T17:32:31+0300\n']
+        with tempfile.TemporaryDirectory() as directory:
+            source_name = os.path.join(directory, "vacancies_by_year.csv")
+            years_directory = os.path.join(directory, "csv_files_by_years")
+            with open(source_name, "w", encoding="utf_8", newline="") as file:
+                file.writelines([header] + rows[:2])
+            manifest = DataSet.get_files_by_years(source_name, years_directory)
+            self.assertEqual({year: info["rows"] for year, info in manifest["years"].items()}, {"2021": 1, "2022": 1})
+            self.assertEqual(DataSet.get_files_by_years(source_name, years_directory), manifest)
+            with open(source_name, "a", encoding="utf_8", newline="") as file:
+                file.write(rows[2])
+            manifest = DataSet.get_files_by_years(source_name, years_directory)
+            self.assertEqual(manifest["years"]["2022"]["rows"], 2)
+            with open(os.path.join(years_directory, "2022.csv"), encoding="utf_8", newline="") as file:
+                self.assertEqual(file.read(), header + "".join(rows[1:]))
+
+    def test_get_files_by_years_partial_line(self):
+        header = 'name,salary_from,salary_to,salary_currency,area_name,published_at\n'
+        rows = ['Программист,1000,2000,RUR,Москва,2021-05-31T17:32:31+0300\n',
+                'Тестировщик,1000,2000,RUR,Москва,2021-06-01T17:32:31+0300\n']
+        with tempfile.TemporaryDirectory() as directory:
+            source_name = os.path.join(directory, "vacancies_by_year.csv")
+            years_directory = os.path.join(directory, "csv_files_by_years")
+            with open(source_name, "w", encoding="utf_8", newline="") as file:
+                file.writelines([header, rows[0], rows[1][:20]])
+            manifest = DataSet.get_files_by_years(source_name, years_directory)
+            self.assertEqual(manifest["offset"], len((header + rows[0]).encode("utf_8")))
+            self.assertEqual(manifest["years"]["2021"]["rows"], 1)
+            with open(source_name, "a", encoding="utf_8", newline="") as file:
+                file.write(rows[1][20:])
+            manifest = DataSet.get_files_by_years(source_name, years_directory)
+            self.assertEqual(manifest["offset"], os.path.getsize(source_name))
+            with open(os.path.join(years_directory, "2021.csv"), encoding="utf_8", newline="") as file:
+                self.assertEqual(file.read(), header + "".join(rows))
+
+    def test_columnar_cache(self):
+        import columnar_cache
+
+        header = 'name,salary_from,salary_to,salary_currency,area_name,published_at\n'
+        rows = ['Программист,1000,2000,RUR,Москва,2021-05-31T17:32:31+0300\n',
+                '<b>Аналитик</b>,1000,2000,USD,Казань,2022-05-31T17:32:31+0300\n',
+                'Тестировщик,1000,,RUR,Москва,2022-06-01T17:32:31+0300\n',
+                'Программист,3000,4000,RUR,Казань,2022-06-01T17:32:31+0300\n']
+        with tempfile.TemporaryDirectory() as directory:
+            cache_directory = columnar_cache.CACHE_DIRECTORY
+            columnar_cache.CACHE_DIRECTORY = os.path.join(directory, "cache")
+            try:
+                source_name = os.path.join(directory, "vacancies.csv")
+                with open(source_name, "w", encoding="utf_8", newline="") as file:
+                    file.writelines([header] + rows)
+                self.assertFalse(columnar_cache.is_fresh(source_name, "vacancies"))
+                self.assertEqual(DataSet.convert_to_cache(source_name)["years"], [2021, 2022])
+                self.assertTrue(columnar_cache.is_fresh(source_name, "vacancies"))
+                self.assertFalse(columnar_cache.is_fresh(source_name))
+                columns = DataSet.get_dataset_from_cache(source_name).vacancies
+                self.assertEqual([vacancy.name for vacancy in columns], ['Программист', 'Аналитик', 'Программист'])
+                self.assertEqual(list(columns.month), [2021 * 12 + 4, 2022 * 12 + 4, 2022 * 12 + 5])
+                columns = DataSet.get_dataset_from_cache(source_name, [2022]).vacancies
+                self.assertEqual(columns.area_names, ['Казань'])
+                table = columnar_cache.read_table(source_name, ["salary_from"], area_name="Казань",
+                                                  profession_name="Программист")
+                self.assertEqual(table.column("salary_from").to_pylist(), [3000.0])
+            finally:
+                columnar_cache.CACHE_DIRECTORY = cache_directory
+
+    def test_columnar_cache_mixed_chunks(self):
+        import columnar_cache
+
+        header = 'name,salary_from,salary_to,salary_currency,area_name,published_at\n'
+        rows = ['Программист,1000,2000,,Москва,2021-05-31T17:32:31+0300\n',
+                'Аналитик,150.5,300,USD,Казань,2022-05-31T17:32:31+0300\n']
+        with tempfile.TemporaryDirectory() as directory:
+            cache_directory = columnar_cache.CACHE_DIRECTORY
+            columnar_cache.CACHE_DIRECTORY = os.path.join(directory, "cache")
+            try:
+                source_name = os.path.join(directory, "vacancies.csv")
+                with open(source_name, "w", encoding="utf_8", newline="") as file:
+                    file.writelines([header] + rows)
+                self.assertEqual(columnar_cache.convert(source_name, chunksize=1)["years"], [2021, 2022])
+                table = columnar_cache.read_table(source_name)
+                self.assertEqual(table.column("salary_from").to_pylist(), [1000.0, 150.5])
+                self.assertEqual(table.column("salary_currency").to_pylist(), [None, 'USD'])
+            finally:
+                columnar_cache.CACHE_DIRECTORY = cache_directory
+
     def test_remove_html_tags(self):
         self.assertEqual(DataSet("file_name").remove_html_tags(["Программист<p></p>", "<strong>Особенности</strong>"]),
                          ['Программист', 'Особенности'])
@@ -108,3 +227,256 @@ class ReportTests(TestCase):
                          'Программист')
 
 
+class ReportExcelTests(TestCase):
+    def test_generate_excel(self):
+        import openpyxl
+
+        with tempfile.TemporaryDirectory() as directory:
+            Report.generate_excel({2022: 204316}, {2022: 428}, {2022: 103546}, {2022: 21},
+                                  {'Казань': 156337, 'Москва': 142291}, {'Москва': 0.1893}, "Программист", directory)
+            wb = openpyxl.load_workbook(os.path.join(directory, "report.xlsx"))
+        sheet1, sheet2 = wb.worksheets
+        self.assertEqual(list(sheet1.iter_rows(min_row=2, values_only=True)), [(2022, 204316, 103546, 428, 21)])
+        self.assertEqual(list(sheet2.iter_rows(min_row=2, values_only=True)),
+                         [('Казань', 156337, None, 'Москва', '18.93%'), ('Москва', 142291, None, None, None)])
+        self.assertEqual(sheet1.column_dimensions['C'].width, len("Средняя зарплата - Программист") + 2)
+        self.assertEqual(sheet2.column_dimensions['C'].width, 2)
+        self.assertTrue(sheet1['A1'].font.b)
+        self.assertEqual(sheet2['B3'].style, "report_cell")
+
+
+class ReportImageTests(TestCase):
+    statistics = ({2021: 150000, 2022: 204316}, {2021: 300, 2022: 428}, {2021: 90000, 2022: 103546},
+                  {2021: 15, 2022: 21}, {'Казань': 156337, 'Москва': 142291}, {'Москва': 0.1893})
+
+    def test_generate_image_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache_directory = os.path.join(directory, "cache")
+            Report.generate_image(*self.statistics, "Программист", directory, cache_directory)
+            template = Report.chart_template
+            Report.generate_image(*self.statistics[:2], {2021: 80000, 2022: 95000}, {2021: 5, 2022: 7},
+                                  *self.statistics[4:], "Аналитик", directory, cache_directory)
+            self.assertIs(Report.chart_template, template)
+            self.assertEqual(len(os.listdir(cache_directory)), 2)
+            cache_name = os.path.join(cache_directory, Report.get_chart_key(*self.statistics, "Программист") + ".png")
+            Report.generate_image(*self.statistics, "Программист", directory, cache_directory)
+            with open(cache_name, "rb") as cache_file, open(os.path.join(directory, "graph.png"), "rb") as image_file:
+                self.assertEqual(cache_file.read(), image_file.read())
+
+
+class ReportPdfTests(TestCase):
+    statistics = ReportImageTests.statistics
+
+    def test_generate_pdf(self):
+        with tempfile.TemporaryDirectory() as directory:
+            Report.generate_image(*self.statistics, "Программист", directory, os.path.join(directory, "cache"))
+            Report.generate_pdf(*self.statistics, "Программист", directory)
+            with open(os.path.join(directory, "report.pdf"), "rb") as pdf_file:
+                self.assertEqual(pdf_file.read(5), b"%PDF-")
+
+    def test_render_template(self):
+        import report_templates
+
+        city_tables = [(["Город", "Уровень зарплат"], [['Казань', 156337]]), (["Город", "Доля вакансий"], [['Москва', '18,93%']])]
+        for template_name in ("pdf_template.html", "pdf_template_2.html"):
+            html = report_templates.render(template_name, "Программист", "graph.png", ["Год", "Средняя зарплата"],
+                                           [[2022, 204316]], city_tables)
+            self.assertEqual([html.count(value) for value in ("204316", "Казань", "18,93%")], [1, 1, 1])
+        self.assertIs(report_templates.get_template("pdf_template.html"), report_templates.get_template("pdf_template.html"))
+
+
+class VacancyStatisticsTests(TestCase):
+    vacancies = [Vacancy(['Программист', 70000, 90000, 'RUR', 'Москва', '2021-05-31T17:32:31+0300']),
+                 Vacancy(['Аналитик', 1000, 3000, 'USD', 'Казань', '2022-05-31T17:32:31+0300']),
+                 Vacancy(['Программист 1С', 50000, 50000, 'RUR', 'Москва', '2022-06-01T10:00:00+0300'])]
+
+    def test_statistics_by_year(self):
+        statistics = InputConnect.get_statistics(self.vacancies, "Программист")
+        self.assertEqual(statistics.get_vacancies_count_by_year("None"), {2021: 1, 2022: 2})
+        self.assertEqual(statistics.get_salary_by_name("None"), {2021: 80000, 2022: 85660})
+        self.assertEqual(statistics.get_vacancies_count_by_year("Программист"), {2021: 1, 2022: 1})
+        self.assertEqual(statistics.get_salary_by_name("Программист"), {2021: 80000, 2022: 50000})
+
+    def test_statistics_by_city(self):
+        statistics = InputConnect.get_statistics(self.vacancies, "Программист")
+        self.assertEqual(statistics.get_salary_by_city(), {'Казань': 121320, 'Москва': 65000})
+        self.assertEqual(statistics.get_vacancy_rate_by_city(), {'Москва': 0.6667, 'Казань': 0.3333})
+
+    def test_empty_statistics(self):
+        statistics = InputConnect.get_statistics(self.vacancies, "Дизайнер")
+        self.assertEqual(statistics.get_vacancies_count_by_year("Дизайнер"), {2022: 0})
+        self.assertEqual(statistics.get_salary_by_name("Дизайнер"), {2022: 0})
+
+    def test_merge_statistics(self):
+        statistics = InputConnect.get_statistics(self.vacancies[:1], "Программист")
+        statistics.merge(InputConnect.get_statistics(self.vacancies[1:], "Программист"))
+        self.assertEqual(statistics.vacancies_count, 3)
+        self.assertEqual(statistics.get_salary_by_city(), {'Казань': 121320, 'Москва': 65000})
+
+    def test_merge_statistics_ties(self):
+        vacancies = [Vacancy(['Программист', 50000, 50000, 'RUR', 'Омск', '2022-05-31T17:32:31+0300']),
+                     Vacancy(['Программист', 50000, 50000, 'RUR', 'Казань', '2021-05-31T17:32:31+0300'])]
+        single_pass = InputConnect.get_statistics(vacancies, "Программист")
+        by_years = InputConnect.get_statistics(vacancies[1:], "Программист")
+        by_years.merge(InputConnect.get_statistics(vacancies[:1], "Программист"))
+        for statistics in (single_pass, by_years):
+            self.assertEqual(list(statistics.get_salary_by_city()), ['Казань', 'Омск'])
+            self.assertEqual(list(statistics.get_vacancy_rate_by_city()), ['Казань', 'Омск'])
+
+    def test_columns_statistics(self):
+        columns = VacancyColumns()
+        for vacancy in self.vacancies:
+            columns.append(vacancy)
+        statistics = InputConnect.get_statistics(columns, "Программист")
+        expected = InputConnect.get_statistics(self.vacancies, "Программист")
+        self.assertEqual(statistics.get_salary_by_name("None"), expected.get_salary_by_name("None"))
+        self.assertEqual(statistics.get_salary_by_name("Программист"), expected.get_salary_by_name("Программист"))
+        self.assertEqual(statistics.get_salary_by_city(), expected.get_salary_by_city())
+        self.assertEqual(statistics.get_vacancy_rate_by_city(), expected.get_vacancy_rate_by_city())
+
+
+class VacancyColumnsTests(TestCase):
+    def test_columns_vacancy_view(self):
+        columns = VacancyColumns()
+        columns.append(Vacancy(['Программист', 70000, 500000, 'RUR', 'Москва', '2022-05-31T17:32:31+0300']))
+        columns.append(Vacancy(['Аналитик', 1000, 3000, 'USD', 'Москва', '2021-05-31T17:32:31+0300']))
+        self.assertEqual(len(columns), 2)
+        self.assertEqual(columns.area_names, ['Москва'])
+        self.assertEqual([vacancy.name for vacancy in columns], ['Программист', 'Аналитик'])
+        self.assertEqual(columns[1].published_at, 2021)
+        self.assertEqual(columns[1].salary_currency, 'USD')
+
+
+class CurrencyRatesTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_name = os.path.join(self.directory.name, "currencies.csv")
+        with open(self.file_name, "w", encoding="utf-8") as file_csv:
+            file_csv.write("date,USD,EUR\n2021-05,70.0,\n2021-06,72.0,88.0\n")
+        self.rates = CurrencyRates(self.file_name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_get_rate(self):
+        self.assertEqual(self.rates.get_rate('USD', '2021-06-01T10:00:00+0300'), 72.0)
+        self.assertEqual(self.rates.get_rate('EUR', '2021-05-01T10:00:00+0300'), 59.90)
+        self.assertEqual(self.rates.get_rate('USD', '2022-01-01T10:00:00+0300'), 60.66)
+        with self.assertRaises(ValueError):
+            self.rates.get_rate('USD', 2021)
+
+    def test_convert_currency(self):
+        vacancy = Vacancy(['Программист', 1000, 3000, 'USD', 'Москва', '2021-05-31T17:32:31+0300'])
+        self.assertEqual(InputConnect.convert_currency(vacancy, self.rates), 140000)
+
+    def test_columns_statistics(self):
+        vacancies = [Vacancy(['Программист', 1000, 3000, 'USD', 'Москва', '2021-05-31T17:32:31+0300']),
+                     Vacancy(['Аналитик', 1000, 3000, 'EUR', 'Москва', '2021-06-30T17:32:31+0300'])]
+        columns = VacancyColumns()
+        for vacancy in vacancies:
+            columns.append(vacancy)
+        expected = InputConnect.get_statistics(vacancies, 'Программист', self.rates)
+        statistics = VacancyStatistics.from_columns(columns, 'Программист', self.rates)
+        self.assertEqual(statistics.get_salary_by_name('None'), {2021: 158000})
+        self.assertEqual(statistics.get_salary_by_name('None'), expected.get_salary_by_name('None'))
+        with self.assertRaises(ValueError):
+            InputConnect.convert_currency(columns[0], self.rates)
+
+
+class VacancyCubeTests(TestCase):
+    def setUp(self):
+        self.columns = VacancyColumns()
+        for vacancy in [Vacancy(['Программист', 1000, 3000, 'RUR', 'Москва', '2021-05-31T17:32:31+0300']),
+                        Vacancy(['Аналитик', 1000, 3000, 'EUR', 'Казань', '2021-06-30T17:32:31+0300']),
+                        Vacancy(['Программист 1С', 4000, 6000, 'RUR', 'Москва', '2022-06-30T17:32:31+0300']),
+                        Vacancy(['Программист', 3000, 5000, 'RUR', 'Москва', '2021-07-31T17:32:31+0300'])]:
+            self.columns.append(vacancy)
+
+    def test_get_statistics(self):
+        cube = VacancyCube.from_columns(self.columns)
+        self.assertEqual(len(cube.year), 3)
+        for profession_name in ('Программист', 'Аналитик', '1С'):
+            statistics = cube.get_statistics(profession_name)
+            expected = VacancyStatistics.from_columns(self.columns, profession_name)
+            for name in ('None', profession_name):
+                self.assertEqual(statistics.get_salary_by_name(name), expected.get_salary_by_name(name))
+                self.assertEqual(statistics.get_vacancies_count_by_year(name),
+                                 expected.get_vacancies_count_by_year(name))
+            self.assertEqual(statistics.get_salary_by_city(), expected.get_salary_by_city())
+            self.assertEqual(statistics.get_vacancy_rate_by_city(), expected.get_vacancy_rate_by_city())
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cube_name = os.path.join(directory, "cube.npz")
+            VacancyCube.from_columns(self.columns, sources={"vacancies": {"size": 1, "mtime": 2}}).save(cube_name)
+            cube = VacancyCube.load(cube_name)
+        self.assertEqual(cube.sources, {"vacancies": {"size": 1, "mtime": 2}})
+        self.assertEqual(cube.area_names, ['Москва', 'Казань'])
+        self.assertEqual(cube.get_statistics('Программист').get_salary_by_name('Программист'), {2021: 3000, 2022: 5000})
+
+
+class NameIndexTests(TestCase):
+    def setUp(self):
+        self.names = ['Программист', 'Аналитик', 'Программист 1С', 'Ведущий программист C++']
+        self.index = NameIndex.build(self.names, [0, 1, 2, 0, 3, 1])
+
+    def test_get_names(self):
+        for substring in ('Программист', 'программист', 'C++', '1С', 'ст', 'Тестировщик', ''):
+            self.assertEqual(self.index.get_names(substring).tolist(),
+                             [code for code, name in enumerate(self.names) if substring in name])
+
+    def test_get_rows(self):
+        self.assertEqual(self.index.get_rows('Программист').tolist(), [0, 2, 3])
+        self.assertEqual(self.index.get_rows('Тестировщик').tolist(), [])
+
+    def test_columns_statistics(self):
+        columns = VacancyColumns()
+        for name, area_name in (('Программист', 'Москва'), ('Аналитик', 'Казань'), ('Программист 1С', 'Казань')):
+            columns.append(Vacancy([name, 1000, 3000, 'RUR', area_name, '2021-05-31T17:32:31+0300']))
+        index = NameIndex.build(columns.names, columns.name)
+        statistics = VacancyStatistics.from_columns(columns, 'Программист', name_index=index)
+        self.assertEqual(statistics.get_vacancies_count_by_year('Программист'), {2021: 2})
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            index_name = os.path.join(directory, "index.npz")
+            self.index.save(index_name)
+            index = NameIndex.load(index_name)
+        self.assertEqual(index.names, self.names)
+        self.assertEqual(index.get_rows('Программист').tolist(), [0, 2, 3])
+
+    def test_get_index(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "vacancies.csv")
+            index_name = os.path.join(directory, "index.npz")
+            with open(file_name, "w", encoding="utf-8") as file:
+                file.write("name\n")
+            index = NameIndex.get_index(file_name, self.names, [0, 1, 2, 0, 3, 1], index_name)
+            self.assertEqual(NameIndex.load(index_name).sources, index.sources)
+            mtime = os.stat(index_name).st_mtime_ns
+            NameIndex.get_index(file_name, self.names, [0, 1, 2, 0, 3, 1], index_name)
+            self.assertEqual(os.stat(index_name).st_mtime_ns, mtime)
+            index = NameIndex.get_index(file_name, self.names, [1, 0, 2, 0, 3, 1], index_name)
+            self.assertEqual(index.get_rows('Программист').tolist(), [1, 2, 3])
+
+
+class ImportTimeTests(TestCase):
+    heavy_modules = {"pandas", "pyarrow", "matplotlib", "openpyxl", "jinja2", "pdfkit", "reportlab", "arrow", "maya"}
+
+    def import_task3(self):
+        code = ("import sys, time\n"
+                "start = time.perf_counter()\n"
+                "import task3\n"
+                "print(time.perf_counter() - start)\n"
+                "print(' '.join(sys.modules))")
+        return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.splitlines()
+
+    def test_lazy_imports(self):
+        self.assertEqual(self.heavy_modules & set(self.import_task3()[1].split()), set())
+
+    # время зависит от загрузки машины, поэтому проверяется только при заданном бюджете в секундах,
+    # например TASK3_IMPORT_BUDGET=0.5
+    @skipUnless(os.environ.get("TASK3_IMPORT_BUDGET"), "TASK3_IMPORT_BUDGET is not set")
+    def test_import_time(self):
+        self.assertLess(float(self.import_task3()[0]), float(os.environ["TASK3_IMPORT_BUDGET"]))